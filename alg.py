@@ -9,6 +9,21 @@ DATE: 3/23/2021
 REVISION HISTORY
   DATE        AUTHOR          CHANGES
   yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   Cycle power statistics streamed with Welford updates, bounded
+                              memory per channel however long a motor runs
+                              Calibration kept as running Welford state, optional sliding
+                              window or EWMA baseline after calibration
+                              cfgAlg.json writes debounced on a background thread, atomic
+                              replace, only changed channels serialized
+                              Per channel MotorModel objects, channels no longer share one
+                              cfgAlg dict and calibration lists
+                              calAlgBatch scores many cycle ends in one NumPy call, numpy
+                              optional with a scalar fallback
+                              cfgAlg.json saver survives write errors and retries, flushCfg
+                              waits for a write in progress
+                              calAlgInit overrides follow the configured channel names
+                              Cycle startup and shutdown skips by elapsed time, channels
+                              polled slower than tInterval are still scored
 
 
 LICENSE:
@@ -50,8 +65,12 @@ HP USER CONFIGURATION (Option B - based on user entry of motor HP or watts)
 """
 
 import os
+import sys
+import math
 import time
 import datetime
+import threading
+from array import array
 
 
 HP2WATTS = 745.7            # HP to Watts
@@ -66,9 +85,16 @@ except ImportError :
         print("Error: import json module failed")
         sys.exit()
 
+# numpy is optional, cycle ends are scored one at a time without it
+try :
+    import numpy as np
+except ImportError :
+    np = None
+
 encoding = 'utf-8'
 
 cfgAlgFileName = 'cfgAlg.json'
+cfgSaveDelay = 10           # seconds to coalesce calibration changes before cfgAlg.json is written
 
 #
 # Default settings for all motors, modify inidividual motors in algInit()...
@@ -96,6 +122,16 @@ cfgAlg = {
     u"meanPower": [],
     u"stdevPower": [],
 
+    # Running sums of squared deviations for the calibration means
+    u"m2Runtime": 0.,
+    u"m2Power": 0.,
+
+    # Baseline after calibration: "FIXED" keeps the calibration, "WINDOW" follows
+    # the last SIGMA_MOTOR_CYCLES cycles, "EWMA" weights each cycle by BASELINE_ALPHA.
+    # Cycles that raise a sigma alert do not update the baseline.
+    u"BASELINE_MODE": "FIXED",
+    u"BASELINE_ALPHA": 0.05,
+
     u"HP_ALG_ENABLE": 0,       # Use HP for alerts
     u"MOTOR_HP": 0.5,          # Motor size in HP
     u"MOTOR_LOW_HP": 0.5,      # Motors are extremely inefficient at less than 50%
@@ -103,18 +139,179 @@ cfgAlg = {
 }
 
 
-motorAlgs = {}                 # Summary of on state power for motors
-powerSeries = []               # Motor profiles during on state
+motorAlgs = {}                 # MotorModel of each motor by chanName
+cycleStats = []                # CycleStats of the on state power of each motor, by chan
+modelNames = []                # chanNames in calAlgInit order, chan index to motorAlgs key
+baselineCache = None           # baselines() arrays, None after any baseline change
+
+
+#
+# Streaming statistics of one on cycle. Samples in the first startup seconds of
+# the cycle are dropped, samples in the last shutdown seconds are held back in a
+# ring buffer, and every older sample is folded into a Welford mean and
+# variance. Skips are by elapsed time, so a channel polled slower than tInterval
+# on a busy bus drops the same seconds. Memory is fixed by the shutdown time,
+# not by how long the motor runs.
+#
+class CycleStats :
+    __slots__ = ("startup", "shutdown", "tail", "tailT", "head", "filled", "start", "n", "mean", "m2", \
+                 "first", "last")
+
+    def __init__(self, startup=0., shutdown=0., tailLen=1) :
+        self.tail = array('d')
+        self.tailT = array('d')
+        self.reset(startup, shutdown, tailLen)
+
+    def reset(self, startup, shutdown, tailLen) :
+        self.startup = startup
+        self.shutdown = shutdown
+        if len(self.tail) != tailLen :
+            self.tail = array('d', bytes(8 * tailLen))
+            self.tailT = array('d', bytes(8 * tailLen))
+        self.head = 0
+        self.filled = 0
+        self.start = None       # time of the first sample
+        self.n = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.first = 0.         # times of the first and last folded samples
+        self.last = 0.
+
+    #
+    # Start over with the same startup and shutdown times
+    #
+    def restart(self) :
+        self.reset(self.startup, self.shutdown, len(self.tail))
+
+    def append(self, t, x) :
+        if self.start is None :
+            self.start = t
+        if t - self.start < self.startup :
+            return
+
+        tail, tailT = self.tail, self.tailT
+        size = len(tail)
+        if self.filled == size :
+            self.fold(tailT[self.head], tail[self.head])
+            self.head = (self.head + 1) % size
+            self.filled -= 1
+        idx = (self.head + self.filled) % size
+        tail[idx] = x
+        tailT[idx] = t
+        self.filled += 1
+
+        # Fold samples older than the shutdown time
+        while self.filled and t - tailT[self.head] >= self.shutdown :
+            self.fold(tailT[self.head], tail[self.head])
+            self.head = (self.head + 1) % size
+            self.filled -= 1
+
+    def fold(self, t, x) :
+        self.n += 1
+        if self.n == 1 :
+            self.first = t
+        self.last = t
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def stdev(self) :
+        return (self.m2 / self.n) ** 0.5 if self.n else 0.
+
+    #
+    # Seconds between the first and last folded samples
+    #
+    def span(self) :
+        return self.last - self.first if self.n else 0.
+
+    #
+    # Flat list of floats for checkpoints, tail (time, power) pairs oldest first
+    #
+    def state(self) :
+        values = [self.startup, self.shutdown, math.nan if self.start is None else self.start, \
+                  self.n, self.mean, self.m2, self.first, self.last]
+        for k in range(self.filled) :
+            idx = (self.head + k) % len(self.tail)
+            values += [self.tailT[idx], self.tail[idx]]
+        return values
+
+    def restore(self, values) :
+        startup, shutdown, start, n, mean, m2, first, last = values[:8]
+        self.startup, self.shutdown = startup, shutdown
+        self.start = None if math.isnan(start) else start
+        self.n, self.mean, self.m2, self.first, self.last = int(n), mean, m2, first, last
+        pairs = values[8:][-2*len(self.tail):]
+        self.head = 0
+        self.filled = len(pairs) // 2
+        for k in range(self.filled) :
+            self.tailT[k], self.tail[k] = pairs[2*k], pairs[2*k+1]
+
+
+#
+# One motor's settings, calibration state and cycle statistics. Every cfgAlg
+# key is a slot holding this motor's own copy, item access by key name is kept
+# for the configuration overrides and the cfgAlg.json format.
+#
+class MotorModel :
+    __slots__ = tuple(cfgAlg) + ("name", "cycle")
+
+    def __init__(self, name) :
+        self.name = name
+        for key, value in cfgAlg.items() :
+            setattr(self, key, list(value) if isinstance(value, list) else value)
+        self.cycle = CycleStats()
+
+    def __getitem__(self, key) :
+        return getattr(self, key)
+
+    def __setitem__(self, key, value) :
+        setattr(self, key, value)
+
+    def __iter__(self) :
+        return iter(cfgAlg)
+
+    #
+    # Replace settings and calibration with those found in a cfgAlg.json entry
+    #
+    def load(self, values) :
+        for key in cfgAlg :
+            if key in values :
+                setattr(self, key, values[key])
+        if "m2Power" not in values :
+            calRebuild(self)
+
+    def toDict(self) :
+        return {key : getattr(self, key) for key in cfgAlg}
+
+    def toJson(self) :
+        return json.dumps(self.toDict())
+
+
+#
+# Startup and shutdown times of a motor, and the shutdown ring length needed
+# when it is sampled every tInterval
+#
+def cycleSkips(chanName, tInterval) :
+    # Remove motor startup and power down time
+    startup = motorAlgs[chanName]["startupTime"]
+    shutdown = motorAlgs[chanName]["shutdownTime"]
+
+    return startup, shutdown, int(math.ceil(shutdown / tInterval)) + 1
 
 
 #
 # Algorithms initialize, reload previous cal data if it exists
+#     tInterval is the sampling interval, used to size the cycle statistics
+#     configNames is the configured channel list the overrides below index,
+#     defaults to chanNames. replay.py passes energyMaster's list, so a replayed
+#     channel gets the same overrides as live whatever the input file order.
 #
-def calAlgInit(chanNames) : 
-    global motorAlgs, powerSeries
+def calAlgInit(chanNames, tInterval=0.5, configNames=None) : 
+    global motorAlgs, cycleStats, modelNames, baselineCache
 
-    motorAlgs = {name : cfgAlg for name in chanNames}
-    powerSeries = [[] for _ in range(len(chanNames))]
+    if configNames is None :
+        configNames = chanNames
+    motorAlgs = {name : MotorModel(name) for name in list(configNames) + list(chanNames)}
 
     try :
         with open(cfgAlgFileName, 'r') as cfgAlgFile :
@@ -122,9 +319,7 @@ def calAlgInit(chanNames) :
             # Replace default values with values from file
             for motor in motorAlgs:  
                 if motor in cfgAlg_temp :
-                    for item in motorAlgs[motor] :
-                        if item in cfgAlg_temp[motor] :
-                            motorAlgs[motor][item] = cfgAlg_temp[motor][item]
+                    motorAlgs[motor].load(cfgAlg_temp[motor])
             
     # If file does not exist, it will be created using defaults.
     except IOError :
@@ -133,43 +328,187 @@ def calAlgInit(chanNames) :
     # === BEGIN USER CONFIGURATION OVERRIDES =======================================
     # Examples...
     # Option A: Sigma method
-    motorAlgs[chanNames[0]]["SIGMA_MOTOR_CYCLES"] = 5        ## Number of on-periods to average
+    motorAlgs[configNames[0]]["SIGMA_MOTOR_CYCLES"] = 5      ## Number of on-periods to average
 
-    motorAlgs[chanNames[0]]["POWER_SIGMA_ALG_ENABLE"] = 1    ## Enabled
-    motorAlgs[chanNames[0]]["POWER_SIGMA_BOUND"] = 1.0       ## Changed from 3.0 to 1.0
+    motorAlgs[configNames[0]]["POWER_SIGMA_ALG_ENABLE"] = 1  ## Enabled
+    motorAlgs[configNames[0]]["POWER_SIGMA_BOUND"] = 1.0     ## Changed from 3.0 to 1.0
 
-    motorAlgs[chanNames[0]]["RUNTIME_SIGMA_ALG_ENABLE"] = 1  ## Enabled
-    motorAlgs[chanNames[0]]["RUNTIME_SIGMA_BOUND"] = 1.0     ## Changed from 3.0 to 1.0
+    motorAlgs[configNames[0]]["RUNTIME_SIGMA_ALG_ENABLE"] = 1  ## Enabled
+    motorAlgs[configNames[0]]["RUNTIME_SIGMA_BOUND"] = 1.0   ## Changed from 3.0 to 1.0
 
-    motorAlgs[chanNames[0]]["startupTime"] = 2               ## seconds
-    motorAlgs[chanNames[0]]["shutdownTime"] = 2              ## seconds
+    motorAlgs[configNames[0]]["startupTime"] = 2             ## seconds
+    motorAlgs[configNames[0]]["shutdownTime"] = 2            ## seconds
     
-    motorAlgs[chanNames[0]]["HP_ALG_ENABLE"] = 0
-    # motorAlgs[chanNames[0]]["MOTOR_HP"] = 2./4.
-    # motorAlgs[chanNames[0]]["MOTOR_LOW_HP"] = 0.5
-    # motorAlgs[chanNames[0]]["MOTOR_HIGH_HP"] = 1.15
+    motorAlgs[configNames[0]]["HP_ALG_ENABLE"] = 0
+    # motorAlgs[configNames[0]]["MOTOR_HP"] = 2./4.
+    # motorAlgs[configNames[0]]["MOTOR_LOW_HP"] = 0.5
+    # motorAlgs[configNames[0]]["MOTOR_HIGH_HP"] = 1.15
 
     # Option B: HP/Wattage percent change
-    if len(chanNames) > 1 :
-        motorAlgs[chanNames[1]]["POWER_SIGMA_ALG_ENABLE"] = 0
-        motorAlgs[chanNames[1]]["POWER_SIGMA_BOUND"] = 3.0
+    if len(configNames) > 1 :
+        motorAlgs[configNames[1]]["POWER_SIGMA_ALG_ENABLE"] = 0
+        motorAlgs[configNames[1]]["POWER_SIGMA_BOUND"] = 3.0
 
-        motorAlgs[chanNames[1]]["RUNTIME_SIGMA_ALG_ENABLE"] = 0
-        motorAlgs[chanNames[1]]["RUNTIME_SIGMA_BOUND"] = 3.0
+        motorAlgs[configNames[1]]["RUNTIME_SIGMA_ALG_ENABLE"] = 0
+        motorAlgs[configNames[1]]["RUNTIME_SIGMA_BOUND"] = 3.0
 
-        motorAlgs[chanNames[1]]["HP_ALG_ENABLE"] = 0
-        motorAlgs[chanNames[1]]["MOTOR_HP"] = 3./4.
-        # motorAlgs[chanNames[1]]["MOTOR_LOW_HP"] = 0.5
-        # motorAlgs[chanNames[1]]["MOTOR_HIGH_HP"] = 1.15
+        motorAlgs[configNames[1]]["HP_ALG_ENABLE"] = 0
+        motorAlgs[configNames[1]]["MOTOR_HP"] = 3./4.
+        # motorAlgs[configNames[1]]["MOTOR_LOW_HP"] = 0.5
+        # motorAlgs[configNames[1]]["MOTOR_HIGH_HP"] = 1.15
 
-        motorAlgs[chanNames[1]]["startupTime"] = 120        # Heat start up time in seconds
-        motorAlgs[chanNames[1]]["shutdownTime"] = 135       # Heating cool down time in seconds
+        motorAlgs[configNames[1]]["startupTime"] = 120      # Heat start up time in seconds
+        motorAlgs[configNames[1]]["shutdownTime"] = 135     # Heating cool down time in seconds
 
     # === END USER CONFIGURATION OVERRIDES ==========================================
 
+    for name in chanNames :
+        motorAlgs[name].cycle.reset(*cycleSkips(name, tInterval))
+    cycleStats = [motorAlgs[name].cycle for name in chanNames]
+    modelNames = list(chanNames)
+    baselineCache = None
+
+    with saveLock :
+        cfgJson.clear()
+        for name in chanNames :
+            cfgJson[name] = motorAlgs[name].toJson()
+
     return
 
 
+#
+# Welford update of a calibration mean and stdev. name is "Runtime" or "Power",
+# the recent cycle values are in the lower case list.
+#
+def calAdd(motorAlg, name, x) :
+    values = motorAlg[name.lower()]
+    values.append(x)
+    n = len(values)
+    mean = motorAlg["mean" + name] if n > 1 else 0.
+    delta = x - mean
+    mean += delta / n
+    motorAlg["mean" + name] = mean
+    motorAlg["m2" + name] = (motorAlg["m2" + name] if n > 1 else 0.) + delta * (x - mean)
+    motorAlg["stdev" + name] = (motorAlg["m2" + name] / n) ** 0.5
+
+
+#
+# Remove the oldest value from a calibration mean and stdev
+#
+def calRemove(motorAlg, name) :
+    values = motorAlg[name.lower()]
+    x = values.pop(0)
+    n = len(values)
+    if n == 0 :
+        motorAlg["mean" + name], motorAlg["m2" + name], motorAlg["stdev" + name] = 0., 0., 0.
+        return
+    mean = motorAlg["mean" + name]
+    delta = x - mean
+    mean -= delta / n
+    motorAlg["mean" + name] = mean
+    motorAlg["m2" + name] = max(0., motorAlg["m2" + name] - delta * (x - mean))
+    motorAlg["stdev" + name] = (motorAlg["m2" + name] / n) ** 0.5
+
+
+#
+# Exponentially weighted mean and stdev
+#
+def calEwma(motorAlg, name, x) :
+    alpha = motorAlg["BASELINE_ALPHA"]
+    delta = x - motorAlg["mean" + name]
+    motorAlg["mean" + name] += alpha * delta
+    motorAlg["stdev" + name] = ((1. - alpha) * (motorAlg["stdev" + name] ** 2 + alpha * delta * delta)) ** 0.5
+
+
+#
+# Running state from the calibration lists of a cfgAlg.json without it
+#
+def calRebuild(motorAlg) :
+    for name in ("Runtime", "Power") :
+        values = motorAlg[name.lower()]
+        motorAlg[name.lower()] = []
+        for x in values :
+            calAdd(motorAlg, name, x)
+
+
+#
+# cfgAlg.json persistence. A changed channel is serialized on the caller's
+# thread, which is cheap and sees a consistent dict. A background thread
+# waits cfgSaveDelay seconds to coalesce changes, then joins the cached JSON of
+# every channel and replaces the file atomically, so sampling never waits on
+# flash and a crash leaves the old or new file, never a torn one. Changes count
+# as saved only once os.replace has succeeded, a failed write is retried.
+#
+cfgJson = {}                    # chanName : JSON of its motorAlgs entry
+cfgVersion = 0                  # bumped by every markDirty
+savedVersion = 0                # cfgVersion in cfgAlg.json on disk
+saveLock = threading.Lock()
+writeLock = threading.Lock()
+saveEvent = threading.Event()
+saveThread = None
+
+def markDirty(chanName) :
+    global saveThread, baselineCache, cfgVersion
+
+    baselineCache = None
+
+    with saveLock :
+        cfgJson[chanName] = motorAlgs[chanName].toJson()
+        cfgVersion += 1
+        if saveThread is None :
+            saveThread = threading.Thread(target=saveLoop, name="cfgAlg", daemon=True)
+            saveThread.start()
+    saveEvent.set()
+
+
+def saveLoop() :
+    while True :
+        saveEvent.wait()
+        time.sleep(cfgSaveDelay)
+        saveEvent.clear()
+        try :
+            writeCfg()
+        except Exception as e :
+            # Disk full, permissions... keep the changes and retry after cfgSaveDelay
+            print("Error writing " + cfgAlgFileName + ": " + str(e))
+            saveEvent.set()
+
+
+#
+# Write cfgAlg.json if it is behind the in-memory settings. Held writeLock
+# makes a caller wait for a write already in progress.
+#
+def writeCfg() :
+    global savedVersion
+
+    with writeLock :
+        with saveLock :
+            version = cfgVersion
+            if version == savedVersion :
+                return
+            s = "{" + ", ".join([json.dumps(name) + ": " + text for name, text in cfgJson.items()]) + "}"
+
+        tmpName = cfgAlgFileName + ".tmp"
+        with open(tmpName, 'w') as cfgAlgFile :
+            cfgAlgFile.write(s)
+            cfgAlgFile.flush()
+            os.fsync(cfgAlgFile.fileno())
+        os.replace(tmpName, cfgAlgFileName)
+        savedVersion = version
+
+
+#
+# Write pending changes now, called on exit. Waits for a background write in
+# progress, then writes whatever that write did not include.
+#
+def flushCfg() :
+    saveEvent.clear()
+    try :
+        writeCfg()
+    except Exception as e :
+        print("Error writing " + cfgAlgFileName + ": " + str(e))
+
+
 #
 # calAlg() is called at motor on-off transition
 # Characterize pump power and runtime, save data to json file.
@@ -178,114 +517,297 @@ def calAlgInit(chanNames) :
 #
 def calAlg(chanName, power, runTime) :
     result = ""
+    m = motorAlgs[chanName]
 
     # Option A, calibration
-    if len(motorAlgs[chanName]["runtime"]) < motorAlgs[chanName]["SIGMA_MOTOR_CYCLES"] :
-        motorAlgs[chanName]["runtime"].append(runTime)
-        xdata = motorAlgs[chanName]["runtime"]
-        rt_l = len(motorAlgs[chanName]["runtime"])
-        mean = sum(xdata) / rt_l
-        variance = sum([((x - mean) ** 2) for x in xdata]) / rt_l
-        res = variance ** 0.5
-        motorAlgs[chanName]["meanRuntime"] = mean
-        motorAlgs[chanName]["stdevRuntime"] = res
-
-        motorAlgs[chanName]["power"].append(power)
-        xdata = motorAlgs[chanName]["power"]
-        pwr_l = len(motorAlgs[chanName]["power"])
-        mean = sum(xdata) / pwr_l
-        variance = sum([((x - mean) ** 2) for x in xdata]) / pwr_l
-        res = variance ** 0.5
-        motorAlgs[chanName]["meanPower"] = mean
-        motorAlgs[chanName]["stdevPower"] = res
-
-        with open(cfgAlgFileName, 'w') as cfgAlgFile:
-            json.dump(motorAlgs, cfgAlgFile)
+    if len(m.runtime) < m.SIGMA_MOTOR_CYCLES :
+        calAdd(m, "Runtime", runTime)
+        calAdd(m, "Power", power)
+        markDirty(chanName)
 
     # Option A, calibration completed
     else :
-        if motorAlgs[chanName]["POWER_SIGMA_ALG_ENABLE"] and \
-                (abs(power - motorAlgs[chanName]["meanPower"]) > \
-                motorAlgs[chanName]["POWER_SIGMA_BOUND"] * motorAlgs[chanName]["stdevPower"]) :
-            result = "Power: " + str(round(power,1)) \
-                     + " Exceeded " + str(cfgAlg["POWER_SIGMA_BOUND"]) \
-                     + " stdev's of " + str(round(motorAlgs[chanName]["stdevPower"],1)) \
-                     + " from mean of " + str(round(motorAlgs[chanName]["meanPower"],1)) + " at initial calibration.\n"
-
-        if motorAlgs[chanName]["RUNTIME_SIGMA_ALG_ENABLE"] \
-                and (abs(runTime - motorAlgs[chanName]["meanRuntime"]) \
-                > motorAlgs[chanName]["RUNTIME_SIGMA_BOUND"] * motorAlgs[chanName]["stdevRuntime"]) :
-            result = result + " Runtime: " + str(round(runTime,1)) \
-                     + " Exceeded " + str(motorAlgs[chanName]["RUNTIME_SIGMA_BOUND"]) \
-                     + " stdev's of " + str(round(motorAlgs[chanName]["stdevRuntime"],1)) \
-                     + " from mean of " + str(round(motorAlgs[chanName]["meanRuntime"],1)) + " at initial calibration.\n"
+        if m.POWER_SIGMA_ALG_ENABLE and (abs(power - m.meanPower) > m.POWER_SIGMA_BOUND * m.stdevPower) :
+            result = powerAlertText(m, power)
+
+        if m.RUNTIME_SIGMA_ALG_ENABLE and (abs(runTime - m.meanRuntime) > m.RUNTIME_SIGMA_BOUND * m.stdevRuntime) :
+            result = result + runtimeAlertText(m, runTime)
+
+        # Adaptive baseline follows normal cycles only
+        if result == "" and m.BASELINE_MODE != "FIXED" :
+            if m.BASELINE_MODE == "WINDOW" :
+                for name, x in (("Runtime", runTime), ("Power", power)) :
+                    calAdd(m, name, x)
+                    calRemove(m, name)
+            elif m.BASELINE_MODE == "EWMA" :
+                calEwma(m, "Runtime", runTime)
+                calEwma(m, "Power", power)
+            markDirty(chanName)
 
     # Option B
-    if motorAlgs[chanName]["HP_ALG_ENABLE"] :
-        if ((power/HP2WATTS) < motorAlgs[chanName]["MOTOR_LOW_HP"]*motorAlgs[chanName]["MOTOR_HP"]) \
-                or ((power/HP2WATTS) > motorAlgs[chanName]["MOTOR_HIGH_HP"]*motorAlgs[chanName]["MOTOR_HP"]) :
-            result = result + " HP: " + str(round(power/HP2WATTS,3)) + " Exceeded limits of " \
-                     + str(round(motorAlgs[chanName]["MOTOR_LOW_HP"]*motorAlgs[chanName]["MOTOR_HP"],3)) + " to " \
-                     + str(round(motorAlgs[chanName]["MOTOR_HIGH_HP"]*motorAlgs[chanName]["MOTOR_HP"],3)) + " HP\n"
+    if m.HP_ALG_ENABLE :
+        if ((power/HP2WATTS) < m.MOTOR_LOW_HP*m.MOTOR_HP) or ((power/HP2WATTS) > m.MOTOR_HIGH_HP*m.MOTOR_HP) :
+            result = result + hpAlertText(m, power)
 
     return result
 
 
+#
+# Alert text, shared by calAlg and calAlgBatch so both report alike
+#
+def powerAlertText(m, power) :
+    return "Power: " + str(round(power,1)) \
+           + " Exceeded " + str(m.POWER_SIGMA_BOUND) \
+           + " stdev's of " + str(round(m.stdevPower,1)) \
+           + " from mean of " + str(round(m.meanPower,1)) + " at initial calibration.\n"
+
+
+def runtimeAlertText(m, runTime) :
+    return " Runtime: " + str(round(runTime,1)) \
+           + " Exceeded " + str(m.RUNTIME_SIGMA_BOUND) \
+           + " stdev's of " + str(round(m.stdevRuntime,1)) \
+           + " from mean of " + str(round(m.meanRuntime,1)) + " at initial calibration.\n"
+
+
+def hpAlertText(m, power) :
+    return " HP: " + str(round(power/HP2WATTS,3)) + " Exceeded limits of " \
+           + str(round(m.MOTOR_LOW_HP*m.MOTOR_HP,3)) + " to " \
+           + str(round(m.MOTOR_HIGH_HP*m.MOTOR_HP,3)) + " HP\n"
+
+
+#
+# Baselines of every channel as NumPy arrays, in calAlgInit channel order.
+# Rebuilt after calibration or a baseline update marks a channel dirty.
+# Call invalidateBaselines() after changing a MotorModel by hand.
+#
+def baselines() :
+    global baselineCache
+
+    if baselineCache is None :
+        models = [motorAlgs[name] for name in modelNames]
+        calibrated = [len(m.runtime) >= m.SIGMA_MOTOR_CYCLES for m in models]
+
+        def col(field, calOnly=False) :
+            return np.array([(m[field] if ok or not calOnly else 0.) for m, ok in zip(models, calibrated)], \
+                    dtype=float)
+
+        baselineCache = {
+            "calibrated"   : np.array(calibrated, dtype=bool),
+            "fixed"        : np.array([ok and m.BASELINE_MODE == "FIXED" for m, ok in zip(models, calibrated)], \
+                                dtype=bool),
+            "powerEnable"  : col("POWER_SIGMA_ALG_ENABLE") != 0,
+            "powerBound"   : col("POWER_SIGMA_BOUND"),
+            "meanPower"    : col("meanPower", True),
+            "stdevPower"   : col("stdevPower", True),
+            "runtimeEnable": col("RUNTIME_SIGMA_ALG_ENABLE") != 0,
+            "runtimeBound" : col("RUNTIME_SIGMA_BOUND"),
+            "meanRuntime"  : col("meanRuntime", True),
+            "stdevRuntime" : col("stdevRuntime", True),
+            "hpEnable"     : col("HP_ALG_ENABLE") != 0,
+            "hpLow"        : col("MOTOR_LOW_HP") * col("MOTOR_HP"),
+            "hpHigh"       : col("MOTOR_HIGH_HP") * col("MOTOR_HP"),
+        }
+
+    return baselineCache
+
+
+def invalidateBaselines() :
+    global baselineCache
+    baselineCache = None
+
+
+#
+# Vectorized Option A and Option B checks, no state is changed.
+#     chans, powers and runTimes are equal length sequences, one entry per
+#     cycle. chans are channel indexes and may repeat, e.g. months of history
+#     for one channel scored against its current baseline.
+#     Returns boolean arrays powerFlag, runtimeFlag, hpFlag
+#
+def scoreCycles(chans, powers, runTimes) :
+    b = baselines()
+    idx = np.asarray(chans, dtype=np.intp)
+    power = np.asarray(powers, dtype=float)
+    runTime = np.asarray(runTimes, dtype=float)
+
+    calibrated = b["calibrated"][idx]
+    powerFlag = calibrated & b["powerEnable"][idx] \
+                & (np.abs(power - b["meanPower"][idx]) > b["powerBound"][idx] * b["stdevPower"][idx])
+    runtimeFlag = calibrated & b["runtimeEnable"][idx] \
+                & (np.abs(runTime - b["meanRuntime"][idx]) > b["runtimeBound"][idx] * b["stdevRuntime"][idx])
+
+    hp = power / HP2WATTS
+    hpFlag = b["hpEnable"][idx] & ((hp < b["hpLow"][idx]) | (hp > b["hpHigh"][idx]))
+
+    return powerFlag, runtimeFlag, hpFlag
+
+
+#
+# calAlg for many cycle ends in one call, returns one alert string per cycle.
+#     Cycles of calibrated channels with a FIXED baseline are scored in one
+#     vectorized pass. Channels still calibrating or with an adaptive baseline
+#     change state per cycle, so those go through calAlg in order. Results match
+#     calling calAlg for each cycle in turn.
+#
+BATCH_MIN = 64      # Fewer cycles than this are cheaper scored one at a time
+
+def calAlgBatch(chans, powers, runTimes) :
+    if np is None or len(chans) < BATCH_MIN :
+        return [calAlg(modelNames[chan], power, runTime) for chan, power, runTime in zip(chans, powers, runTimes)]
+
+    idx = np.asarray(chans, dtype=np.intp)
+    fixed = baselines()["fixed"][idx]
+    powerFlag, runtimeFlag, hpFlag = scoreCycles(idx, powers, runTimes)
+    results = [""] * len(chans)
+
+    for i in np.flatnonzero(~fixed).tolist() :
+        results[i] = calAlg(modelNames[chans[i]], powers[i], runTimes[i])
+
+    for i in np.flatnonzero(fixed & (powerFlag | runtimeFlag | hpFlag)).tolist() :
+        m = motorAlgs[modelNames[chans[i]]]
+        result = ""
+        if powerFlag[i] :
+            result = powerAlertText(m, powers[i])
+        if runtimeFlag[i] :
+            result = result + runtimeAlertText(m, runTimes[i])
+        if hpFlag[i] :
+            result = result + hpAlertText(m, powers[i])
+        results[i] = result
+
+    return results
+
+
 #      
 # Collect motor profile during on time
 #      
-def motorStatsAppend(chan, pwr) :
-    global powerSeries
-
-    powerSeries[chan].append(pwr)
+def motorStatsAppend(chan, t, pwr) :
+    cycleStats[chan].append(t, pwr)
 
 
-#      
-# Sump Pump / Motor Algorithm
-# Called when motor transition from on to off state detected
 #
-def motorStats(chan, chanNames, runTime, tInterval) :
-    global powerSeries
+# Summary of the cycle just ended, stats are reset for the next cycle.
+#     Returns hdr, rtnString and the average power, which is None when the
+#     cycle was too short to score. Pass the average power to calAlg or
+#     calAlgBatch.
+#
+def cycleSummary(chan, chanNames, runTime, tInterval) :
+    hdr = "Runtime (s),Avg (W),StdDev (W)"
 
-    t = time.time()
+    # Average power and stdev, startup and shutdown samples excluded. Scored
+    # once the kept samples span 10 sample intervals, however slowly polled.
+    stats = cycleStats[chan]
+    if stats.n > 1 and stats.span() >= 10 * tInterval :
+        meanPwr = stats.mean
+        res = stats.stdev()
 
-    hdr = "Runtime (s),Avg (W),StdDev (W)"
+        rtnString = "{:.1f},{:.1f},{:.1f}".format(runTime, meanPwr, res)
 
-    # Remove motor startup and power down time
-    if motorAlgs[chanNames[chan]]["startupTime"] % tInterval :
-        start = motorAlgs[chanNames[chan]]["startupTime"] // tInterval + 1
     else :
-        start = motorAlgs[chanNames[chan]]["startupTime"] // tInterval
+        meanPwr = None
+        rtnString = ""
 
-    if motorAlgs[chanNames[chan]]["shutdownTime"] % tInterval :
-        end = motorAlgs[chanNames[chan]]["shutdownTime"] // tInterval + 1
-    else :
-        end = motorAlgs[chanNames[chan]]["shutdownTime"] // tInterval
-    
-    powerSeries[chan] = powerSeries[chan][int(start):-int(end)]
+    stats.reset(*cycleSkips(chanNames[chan], tInterval))
 
-    # Calculate average power and stdev
-    seriesLen = len(powerSeries[chan])
-    if seriesLen > 10 :
-        meanPwr = sum(powerSeries[chan]) / seriesLen
-        variance = sum([((x - meanPwr) ** 2) for x in powerSeries[chan]]) / seriesLen
-        res = variance ** 0.5
+    return hdr, rtnString, meanPwr
 
-        rtnString = "{:.1f},{:.1f},{:.1f}".format(runTime, meanPwr, res)
-        alertMsg = calAlg(chanNames[chan], meanPwr, runTime)
 
+#      
+# Sump Pump / Motor Algorithm
+# Called when motor transition from on to off state detected
+#
+def motorStats(chan, chanNames, runTime, tInterval) :
+    hdr, rtnString, meanPwr = cycleSummary(chan, chanNames, runTime, tInterval)
+
+    if meanPwr is not None :
+        alertMsg = calAlg(chanNames[chan], meanPwr, runTime)
     else :
-        rtnString = ""
         alertMsg = ""
 
-    powerSeries[chan] = []
-
     return hdr, rtnString, alertMsg
 
 
+#
+# Benchmark calAlgBatch against calAlg, python3 alg.py bench [chans] [cycles]
+#     Baselines are calibrated from random cycles and saved to a temporary
+#     cfgAlg.json, the cfgAlg.json in the current directory is left alone.
+#
+def benchScoring(numChans=64, numCycles=200000) :
+    global cfgAlgFileName
+    import tempfile
+    import random
+
+    cfgAlgFileName = os.path.join(tempfile.mkdtemp(), "cfgAlg.json")
+    names = ["Motor" + str(n) for n in range(numChans)]
+    calAlgInit(names)
+
+    rng = random.Random(1)
+    for m in motorAlgs.values() :
+        m.POWER_SIGMA_ALG_ENABLE = 1
+        m.RUNTIME_SIGMA_ALG_ENABLE = 1
+        m.HP_ALG_ENABLE = 1
+        m.MOTOR_HP = 0.5
+        for n in range(m.SIGMA_MOTOR_CYCLES) :
+            calAlg(m.name, rng.gauss(300., 15.), rng.gauss(60., 5.))
+
+    chans = [rng.randrange(numChans) for n in range(numCycles)]
+    powers = [rng.gauss(300., 15.) for n in range(numCycles)]
+    runTimes = [rng.gauss(60., 5.) for n in range(numCycles)]
+
+    # History, every cycle in one call
+    t0 = time.perf_counter()
+    scalar = [calAlg(names[c], p, r) for c, p, r in zip(chans, powers, runTimes)]
+    tScalar = time.perf_counter() - t0
+
+    invalidateBaselines()
+    t0 = time.perf_counter()
+    batch = calAlgBatch(chans, powers, runTimes)
+    tBatch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scoreCycles(chans, powers, runTimes)
+    tScore = time.perf_counter() - t0
+
+    chanArray, powerArray, runTimeArray = np.array(chans), np.array(powers), np.array(runTimes)
+    t0 = time.perf_counter()
+    scoreCycles(chanArray, powerArray, runTimeArray)
+    tArray = time.perf_counter() - t0
+
+    print("{} cycles over {} channels, {} alerts, results match: {}".format(numCycles, numChans, \
+            sum(1 for a in scalar if a), scalar == batch))
+    print("calAlg      {:10.0f} cycles/s".format(numCycles / tScalar))
+    print("calAlgBatch {:10.0f} cycles/s  {:5.1f}x".format(numCycles / tBatch, tScalar / tBatch))
+    print("scoreCycles {:10.0f} cycles/s  {:5.1f}x, flags only".format(numCycles / tScore, tScalar / tScore))
+    print("scoreCycles {:10.0f} cycles/s  {:5.1f}x, flags only, ndarray input".format(numCycles / tArray, \
+            tScalar / tArray))
+
+    # Tick, every channel ends a cycle at once
+    ticks = numCycles // numChans
+    tickChans = list(range(numChans))
+    t0 = time.perf_counter()
+    for n in range(ticks) :
+        k = n * numChans
+        [calAlg(names[c], p, r) for c, p, r in zip(tickChans, powers[k:k+numChans], runTimes[k:k+numChans])]
+    tScalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for n in range(ticks) :
+        k = n * numChans
+        calAlgBatch(tickChans, powers[k:k+numChans], runTimes[k:k+numChans])
+    tBatch = time.perf_counter() - t0
+
+    print("Tick of {} cycle ends: calAlg {:.1f} us, calAlgBatch {:.1f} us".format(numChans, \
+            tScalar / ticks * 1e6, tBatch / ticks * 1e6))
+
+
 # === Test code ==================================================================
 if __name__ == '__main__':
 
+    if len(sys.argv) > 1 and sys.argv[1] == "bench" :
+        if np is None :
+            print("numpy not installed, calAlgBatch falls back to calAlg")
+            sys.exit()
+        benchScoring(*[int(arg) for arg in sys.argv[2:4]])
+        sys.exit()
+
     import numpy as np
 
     tInterval = 0.5
@@ -297,7 +819,7 @@ if __name__ == '__main__':
     meanRuntime = 10
     stdRuntime = 3.0
 
-    calAlgInit(chanNames)
+    calAlgInit(chanNames, tInterval)
     chan=0
 
     runtime = 0
@@ -307,11 +829,13 @@ if __name__ == '__main__':
         power = meanPower + stdPower * np.random.randn()
         print(power)
         runtime += tInterval
-        motorStatsAppend(chan, power)
+        motorStatsAppend(chan, runtime, power)
 
     hdr, rtnString, alertMsg = motorStats(chan, chanNames, runtime, tInterval)
     print(hdr)
     print(rtnString)
     print(alertMsg)
 
+    flushCfg()
+
     print("Done.")
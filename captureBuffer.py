@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Per channel ring buffer of the latest readings, preallocated array('d')
+    columns that are overwritten in place, and compact binary capture files
+    of a buffer's contents for the pre-fault context of an alert.
+
+        buf = RingBuffer(1200)
+        buf.append(t, voltage, amperage, power, powerFactor, frequency)
+        data = buf.snapshot()                  # copy, oldest sample first
+        dump(fileName, chanName, reason, data)
+        chanName, reason, data = load(fileName)
+
+    Voltage, amperage, power factor and frequency are NaN for samples from a
+    power only poll, they were not read.
+
+    Capture file layout, little endian:
+        header   magic 'EMCP', version, numFields, count
+        strings  length and utf-8 bytes of the channel name, then the reason
+        columns  numFields x count doubles, in FIELDS order
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import struct
+from array import array
+
+
+FIELDS = ("time", "voltage", "amperage", "power", "powerFactor", "frequency")
+
+MAGIC = b'EMCP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+LENGTH = struct.Struct('<H')
+
+
+class RingBuffer :
+    __slots__ = ("size", "count", "head", "cols")
+
+    def __init__(self, size) :
+        self.size = size
+        self.count = 0
+        self.head = 0           # Index of the next write
+        self.cols = [array('d', bytes(8 * size)) for field in FIELDS]
+
+    def append(self, t, voltage, amperage, power, powerFactor, frequency) :
+        head = self.head
+        cols = self.cols
+        cols[0][head] = t
+        cols[1][head] = voltage
+        cols[2][head] = amperage
+        cols[3][head] = power
+        cols[4][head] = powerFactor
+        cols[5][head] = frequency
+
+        self.head = (head + 1) % self.size
+        if self.count < self.size :
+            self.count += 1
+
+    #
+    # Copy of the buffered samples, oldest first
+    #     returns [array('d'), ...] in FIELDS order
+    #
+    def snapshot(self) :
+        if self.count < self.size :
+            return [col[:self.count] for col in self.cols]
+        return [col[self.head:] + col[:self.head] for col in self.cols]
+
+
+#
+# Write a capture file
+#
+def dump(fileName, chanName, reason, data) :
+    name = chanName.encode('utf-8')
+    why = reason.encode('utf-8')
+
+    parts = [HEADER.pack(MAGIC, VERSION, len(FIELDS), len(data[0])),
+             LENGTH.pack(len(name)), name, LENGTH.pack(len(why)), why]
+    for col in data :
+        parts.append(col.tobytes())
+
+    with open(fileName + ".tmp", 'wb') as f :
+        f.write(b"".join(parts))
+    os.replace(fileName + ".tmp", fileName)
+
+
+#
+# Read a capture file
+#     returns chanName, reason, {field : array('d')}
+#
+def load(fileName) :
+    with open(fileName, 'rb') as f :
+        data = f.read()
+
+    magic, version, numFields, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION :
+        raise ValueError(fileName + " is not a capture file")
+
+    offset = HEADER.size
+    strings = []
+    for n in range(2) :
+        length = LENGTH.unpack_from(data, offset)[0]
+        offset += LENGTH.size
+        strings.append(data[offset:offset+length].decode('utf-8'))
+        offset += length
+
+    cols = {}
+    for field in FIELDS[:numFields] :
+        cols[field] = array('d', data[offset:offset+8*count])
+        offset += 8 * count
+
+    return strings[0], strings[1], cols
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    import time
+    import tempfile
+
+    buf = RingBuffer(1200)          # 10 minutes at 0.5 s
+    n = 100000
+    t0 = time.perf_counter()
+    for i in range(n) :
+        buf.append(i * 0.5, 120., 2.5, 300. + i % 7, 0.98, 60.)
+    dt = time.perf_counter() - t0
+    print("append: {:.2f} us".format(dt * 1e6 / n))
+
+    fileName = os.path.join(tempfile.mkdtemp(), "capture.bin")
+    t0 = time.perf_counter()
+    dump(fileName, "Sump", "Power exceeded", buf.snapshot())
+    print("snapshot and dump: {:.2f} ms, {} bytes".format((time.perf_counter() - t0) * 1000., os.path.getsize(fileName)))
+
+    chanName, reason, cols = load(fileName)
+    assert cols["time"][0] == (n - 1200) * 0.5 and cols["time"][-1] == (n - 1) * 0.5
+    print(chanName, reason, len(cols["power"]), "samples")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Channel state store for energyMaster.py. Every per-channel value is a
+    column, a preallocated array('d') with one entry per channel, held in a
+    single ChanState object. Columns are allocated once and reset in place, so
+    the sampling loop makes no per-tick allocations. Interval and day rollovers
+    swap column references, then zero the new current column.
+
+        st = ChanState(len(chanNames))
+        st.power[chan] = 123.4
+        st.rollover(INTERVAL_ROLLOVER)
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+from array import array
+
+
+COLUMNS = (
+    # Current state
+    "lastStateOn",          # 0=Off, 1=On
+    "voltage",              # Volts
+    "amperage",             # Amperes
+    "power",                # Watts
+    "energy",               # Watt-hours
+    "frequency",            # Hertz
+    "powerFactor",
+    "alarmStatus",          # See supplier docs
+    "fullRead",             # 1 if the last read returned every register, 0 for power only
+
+    # Polling
+    "lastReadTime",         # Seconds since epoch of the channel's last read
+    "lastPower",            # Watts at the last read, for trapezoidal energy integration
+    "nextPoll",             # Seconds since epoch when the channel is next due
+    "pollInterval",         # Seconds between the last read and the next
+    "nextFullRead",         # Seconds since epoch when the next full register read is due
+    "readFailures",         # Consecutive reads the meter did not answer
+
+    # Alerts
+    "onTime",               # time motor turned on
+    "maxRuntimeLastEmailTime",    # Last time email was sent
+    "algLastEmailTime",     # Last time email was sent
+
+    # Current interval
+    "cycles",               # Off-On state changes
+    "runTime",              # Run time in interval - seconds
+    "powerConsumed",        # Watt-hours
+
+    # Last interval
+    "cyclesLastInterval",
+    "runTimeLastInterval",
+    "powerConsumedLastInterval",
+
+    # Today
+    "cyclesToday",
+    "runTimeToday",
+    "powerConsumedToday",
+    "minRunTimeToday",
+    "maxRunTimeToday",
+
+    # Yesterday
+    "cyclesYesterday",
+    "runTimeYesterday",
+    "powerConsumedYesterday",
+    "minRunTimeYesterday",
+    "maxRunTimeYesterday",
+)
+
+# (current, previous) column pairs
+INTERVAL_ROLLOVER = (
+    ("cycles", "cyclesLastInterval"),
+    ("runTime", "runTimeLastInterval"),
+    ("powerConsumed", "powerConsumedLastInterval"),
+)
+
+DAY_ROLLOVER = (
+    ("cyclesToday", "cyclesYesterday"),
+    ("runTimeToday", "runTimeYesterday"),
+    ("powerConsumedToday", "powerConsumedYesterday"),
+    ("minRunTimeToday", "minRunTimeYesterday"),
+    ("maxRunTimeToday", "maxRunTimeYesterday"),
+)
+
+
+class ChanState :
+    __slots__ = COLUMNS + ("numChans", "zeros")
+
+    def __init__(self, numChans) :
+        self.numChans = numChans
+        self.zeros = array('d', bytes(8 * numChans))
+        for name in COLUMNS :
+            setattr(self, name, array('d', self.zeros))
+
+    #
+    # Zero the named columns in place
+    #
+    def reset(self, names) :
+        for name in names :
+            getattr(self, name)[:] = self.zeros
+
+    #
+    # Fill one column in place
+    #
+    def fill(self, name, value) :
+        col = getattr(self, name)
+        for chan in range(self.numChans) :
+            col[chan] = value
+
+    #
+    # Move each current column to its previous column and zero the current one.
+    # Only the column references are swapped, the arrays are reused.
+    #
+    def rollover(self, pairs) :
+        for current, previous in pairs :
+            col = getattr(self, previous)
+            setattr(self, previous, getattr(self, current))
+            col[:] = self.zeros
+            setattr(self, current, col)
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    st = ChanState(4)
+    st.cycles[1] = 3
+    st.runTime[1] = 12.5
+    st.rollover(INTERVAL_ROLLOVER)
+    print(st.cycles, st.cyclesLastInterval)
+    print(st.runTime, st.runTimeLastInterval)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   Version 2, cycles in progress saved as CycleStats state
+                              Version 3, channel names saved, a renamed or reordered
+                              channel list is not restored
+                              Version 4, CycleStats skips by time
+
+
+OVERVIEW:
+    Compact binary checkpoints of the channel state (chanState.ChanState) and
+    a list of floats per channel for the cycles in progress.
+
+    snapshot() packs the state into bytes on the caller's thread, which takes
+    microseconds and sees a consistent state. write() stores it atomically,
+    temp file, fsync and os.replace, so a power blip leaves either the old or
+    the new checkpoint, never a torn one. It is meant to run off the hot path.
+    restore() checks the CRC and the channel names, and matches columns by
+    name, so a checkpoint from a build with other columns still restores the
+    common ones. Counters are never restored into a renamed or reordered
+    channel.
+
+    File layout, little endian:
+        header   magic 'EMCK', version, numChans, numCols, savedAt (s since epoch)
+        chans    length, newline separated utf-8 channel names
+        names    length, comma separated column names
+        columns  numCols x numChans doubles
+        series   per channel count, then count doubles
+        trailer  CRC32 of everything above
+
+    stats holds the cost of the last snapshot, write and restore.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import time
+import struct
+import zlib
+from array import array
+
+import chanState
+
+
+MAGIC = b'EMCK'
+VERSION = 4         # 2: series holds alg.CycleStats.state(), not raw power samples
+                    # 3: channel names stored
+                    # 4: CycleStats state by time, tail holds (time, power) pairs
+HEADER = struct.Struct('<4sHHHd')
+COUNT = struct.Struct('<I')
+
+stats = {"saves": 0, "bytes": 0, "snapshotMs": 0., "writeMs": 0., "restoreMs": 0.}
+
+
+#
+# Pack the state and power series into checkpoint bytes
+#     chanNames are the names of the channels in st, in order
+#     series is a list of floats per channel, alg.CycleStats.state()
+#
+def snapshot(st, chanNames, series, savedAt=None) :
+    t0 = time.perf_counter()
+
+    if savedAt is None :
+        savedAt = time.time()
+    chans = "\n".join(chanNames).encode('utf-8')
+    names = ",".join(chanState.COLUMNS).encode('ascii')
+
+    parts = [HEADER.pack(MAGIC, VERSION, st.numChans, len(chanState.COLUMNS), savedAt),
+             COUNT.pack(len(chans)), chans, COUNT.pack(len(names)), names]
+    for name in chanState.COLUMNS :
+        parts.append(getattr(st, name).tobytes())
+    for chan in range(st.numChans) :
+        parts.append(COUNT.pack(len(series[chan])))
+        parts.append(array('d', series[chan]).tobytes())
+
+    data = b"".join(parts)
+    data += COUNT.pack(zlib.crc32(data))
+
+    stats["snapshotMs"] = (time.perf_counter() - t0) * 1000.
+    return data
+
+
+#
+# Atomically replace the checkpoint file
+#
+def write(fileName, data) :
+    t0 = time.perf_counter()
+
+    tmpName = fileName + ".tmp"
+    with open(tmpName, 'wb') as f :
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmpName, fileName)
+
+    stats["saves"] += 1
+    stats["bytes"] = len(data)
+    stats["writeMs"] = (time.perf_counter() - t0) * 1000.
+
+
+#
+# Restore a checkpoint into st and series
+#     chanNames must match the names saved, same names in the same order
+#     returns savedAt, or None if there is no usable checkpoint
+#
+def restore(fileName, st, chanNames, series) :
+    t0 = time.perf_counter()
+
+    try :
+        with open(fileName, 'rb') as f :
+            data = f.read()
+    except IOError :
+        return None
+
+    if len(data) < HEADER.size + COUNT.size or \
+            COUNT.unpack_from(data, len(data) - COUNT.size)[0] != zlib.crc32(data[:-COUNT.size]) :
+        print("Checkpoint " + fileName + " is corrupt, ignored")
+        return None
+
+    magic, version, numChans, numCols, savedAt = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or numChans != st.numChans :
+        print("Checkpoint " + fileName + " does not match this configuration, ignored")
+        return None
+
+    offset = HEADER.size
+    chansLen = COUNT.unpack_from(data, offset)[0]
+    offset += COUNT.size
+    chans = data[offset:offset+chansLen].decode('utf-8').split("\n")
+    offset += chansLen
+    if chans != list(chanNames) :
+        print("Checkpoint " + fileName + " channel names do not match chanNames, ignored")
+        return None
+
+    namesLen = COUNT.unpack_from(data, offset)[0]
+    offset += COUNT.size
+    names = data[offset:offset+namesLen].decode('ascii').split(",")
+    offset += namesLen
+
+    colBytes = 8 * numChans
+    for name in names[:numCols] :
+        if name in chanState.COLUMNS :
+            getattr(st, name)[:] = array('d', data[offset:offset+colBytes])
+        offset += colBytes
+
+    for chan in range(numChans) :
+        count = COUNT.unpack_from(data, offset)[0]
+        offset += COUNT.size
+        series[chan] = array('d', data[offset:offset+8*count]).tolist()
+        offset += 8 * count
+
+    stats["restoreMs"] = (time.perf_counter() - t0) * 1000.
+    return savedAt
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    import tempfile
+
+    numChans = 32
+    st = chanState.ChanState(numChans)
+    for chan in range(numChans) :
+        st.cyclesToday[chan] = chan
+        st.powerConsumedToday[chan] = chan * 1.5
+    series = [[100. + n for n in range(600)] if chan % 4 == 0 else [] for chan in range(numChans)]
+
+    chanNames = ["Chan" + str(chan) for chan in range(numChans)]
+    fileName = os.path.join(tempfile.mkdtemp(), "energyMaster.ckpt")
+    write(fileName, snapshot(st, chanNames, series))
+
+    st2 = chanState.ChanState(numChans)
+    series2 = [[] for chan in range(numChans)]
+    restore(fileName, st2, chanNames, series2)
+
+    assert st2.powerConsumedToday == st.powerConsumedToday and series2 == series
+    assert restore(fileName, st2, chanNames[::-1], series2) is None
+    print("{} channels, {} bytes: snapshot {:.3f} ms, write {:.3f} ms, restore {:.3f} ms".format( \
+            numChans, stats["bytes"], stats["snapshotMs"], stats["writeMs"], stats["restoreMs"]))
@@ -9,6 +9,39 @@ DATE: 03/23/2021
 REVISION HISTORY
   DATE        AUTHOR          CHANGES
   yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   readPower() reads each RS-485 bus in a single session
+                              Buses on separate USB dongles are read concurrently
+                              Added asyncio sampling loop as an alternative to the Timer chain
+                              Idle channels are polled at a slower per-channel rate
+                              Fast power only reads between full register reads
+                              Missed reads are skipped instead of counted as off, display
+                              shows per-meter read latency and error count
+                              Per-channel values moved to a preallocated chanState.ChanState
+                              Timer chain replaced by a drift free scheduler thread, interval
+                              and day boundaries fire when crossed, tick jitter displayed
+                              Sampling decoupled from accounting, sinks, alerts and display
+                              by bounded queue pipeline stages with drop counters
+                              Display drawn to a screen buffer and only changed cells written,
+                              pages across channels, own thread or off for headless runs
+                              Channel state and cycles in progress checkpointed to a binary
+                              file and restored on start
+                              Per bus read capacity from measured latency replaces the 10
+                              channel limit, busy buses read their most overdue meters
+                              Removed trimLogs(), pubScribe rotates the details logs
+                              Readings kept in a per-channel ring buffer, dumped to a binary
+                              capture on an alert, details csv log off by default
+                              Opt-in stage timing with rolling percentiles, logged to
+                              logProfile and shown on screen
+                              Message and alert text use the reading time, for replay.py
+                              Checkpoints hold alg.cycleStats accumulators
+                              Pending alg calibration changes flushed on exit
+                              Channels whose cycles end on the same tick are scored in one
+                              alg.calAlgBatch call
+                              Alerts and status no longer write around the screen renderer
+                              Bus capacity ignores meters on a port that will not open
+                              Meters that do not answer are polled with a growing back off
+                              Run time limit captured whatever the email settings, values
+                              not read by a power only poll are NaN in the capture buffer
 
 
 GENERAL INFO
@@ -85,13 +118,21 @@ import os
 import sys
 import time
 import datetime
-from threading import Timer
+from concurrent.futures import ThreadPoolExecutor
 import math
-import subprocess
+import asyncio
 
 import pzem             # power meter serial comm
 import alg              # algorithms for alerts
 import pubScribe
+import chanState
+import scheduler
+import pipeline
+import screen
+import shutil
+import checkpoint
+import captureBuffer
+import profiler
 
 
 #
@@ -105,11 +146,34 @@ chanNames = ["Light"]
 chanPorts = ["/dev/ttyUSB0", "/dev/ttyUSB1", "/dev/ttyUSB2", "/dev/ttyUSB3"]   # One entry per chanName[]
 chanAddrs = [0x01, 0x01, 0x01, 0x01]                                           # One entry per chanName[]
 chanOnThresholds = [5, 20, 20, 20]                                 # Watts, with one entry per chanName[]
+chanIdleIntervals = [5, 5, 5, 5]    # Seconds between polls while a channel is idle, one entry per chanName[]
+idleFraction = 0.5                  # Idle when off and power below this fraction of chanOnThresholds[]
+tFullRead = 5      # seconds between full voltage/current/energy/freq/PF/alarm reads of a channel,
+                   # other polls read power only. 0 reads all registers on every poll.
 
 # Timing parameters
 tInterval = 0.5    # time interval in seconds between measuring current
                    # Nominal time on RPi3 is 0.072 seconds, don't go below 0.1 on RPi3 or Zero
 tLog = 15          # time interval in minutes between logging energy measurements to csv file
+concurrentBuses = 1   # non zero reads each chanPorts bus on its own worker thread at the same time
+asyncLoopEnabled = 0  # non zero runs sampling, reads and sinks in one asyncio event loop instead of the scheduler thread
+pipelineEnabled = 1   # non zero hands samples to queued accounting, sink, alert and display stages off the scheduler thread
+
+nominalReadTime = 0.1     # seconds per meter read, used until reads have been measured
+minReadTime = 0.001       # floor on a measured read time, seconds
+readRetryMax = 60         # seconds, longest back off between reads of a meter that does not answer
+busUtilization = 0.8      # fraction of tInterval a bus may spend reading meters
+capacityInterval = 60     # seconds between updates of bus capacity from measured read latency
+
+checkpointFileName = "energyMaster.ckpt"
+checkpointInterval = 30   # seconds between checkpoints of counters and cycles in progress, 0 disables
+checkpointMaxGap = 120    # seconds, cycles in progress do not survive a longer restart
+
+captureMinutes = 10       # minutes of readings kept in memory per channel and dumped on an alert, 0 disables
+detailsLogEnabled = 0     # non zero also logs every on reading to the logDetails csv files
+
+profileEnabled = 0        # non zero times each stage per tick, per bus and per channel
+profileInterval = 60      # seconds between logProfile records when profileEnabled
 
 #
 # --- User Email Alerts Configuration ---
@@ -130,61 +194,214 @@ minIntervalBtwEmails = [600] * len(chanNames)  # Wait this long before sending a
 
 # --- END USER CONFIG ---
 
-messageRow = 33
+messageRow = 36
+displayEnabled = 1     # zero for headless service runs, no terminal output
+displayThreaded = 0    # non zero refreshes the display from its own thread every displayInterval seconds
+displayInterval = 1.   # seconds between display refreshes when displayThreaded
+pageSeconds = 5        # seconds per page when there are more channels than fit across the terminal
 messageText = ""
 
-onTime = [0] * len(chanNames)                     # time motor turned on
-maxRuntimeLastEmailTime = [0] * len(chanNames)    # Last time email was sent
-algLastEmailTime = [0] * len(chanNames)           # Last time email was sent
+#
+# Per-channel state, one preallocated column per value, see chanState.py
+#
+st = chanState.ChanState(len(chanNames))
+st.fill("pollInterval", tInterval)
+
+#
+# Per-channel ring buffers of the latest readings, see captureBuffer.py
+#
+captureBufs = [captureBuffer.RingBuffer(max(1, int(captureMinutes * 60 / tInterval))) \
+        for chan in range(len(chanNames))] if captureMinutes else []
 
 
 #
-# Motor Data
+# Group channels by RS-485 bus (chanPorts entry) so that every PZEM address on
+# a bus is read back to back over one open connection.
+#     returns {chanPort : [chan, ...]}
 #
-lastReadTime = 0					# Seconds since epoch
+def groupChanBuses() :
+    buses = {}
+    for chan in range(0, len(chanNames)) :
+        buses.setdefault(chanPorts[chan], []).append(chan)
+    return buses
 
+chanBuses = groupChanBuses()
 
-# Current state
-lastStateOn = [0] * len(chanNames)         # 0=Off, 1=On
-voltage     = [0] * len(chanNames)         # Volts
-amperage    = [0] * len(chanNames)         # Amperes
-power       = [0] * len(chanNames)         # Watts
-energy      = [0] * len(chanNames)         # Watt-hours
-frequency   = [0] * len(chanNames)         # Hertz
-powerFactor = [0] * len(chanNames)
-alarmStatus = [0] * len(chanNames)         # See supplier docs
 
-# Current interval
-cycles        = [0] * len(chanNames)       # Off-On state changes
-runTime       = [0] * len(chanNames)       # Run time in interval - seconds
-powerConsumed = [0] * len(chanNames)       # Watt-hours
+#
+# Channels due to be read this tick, grouped by bus
+#     returns {chanPort : [chan, ...]}
+#
+def dueBuses(t) :
+    buses = {}
+    for chanPort, chans in chanBuses.items() :
+        due = [chan for chan in chans if t >= st.nextPoll[chan] - tInterval/2.]
+        if len(due) > busSlots.get(chanPort, len(due)) :
+            # More meters due than fit in a tick, the most overdue go first
+            due = sorted(due, key=lambda chan : st.nextPoll[chan])[:busSlots[chanPort]]
+        if due :
+            buses[chanPort] = due
+    return buses
 
-# Last interval
-cyclesLastInterval        = [0] * len(chanNames)
-runTimeLastInterval       = [0] * len(chanNames)
-powerConsumedLastInterval = [0] * len(chanNames)
 
-# Today
-cyclesToday        = [0] * len(chanNames)
-runTimeToday       = [0] * len(chanNames)
-powerConsumedToday = [0] * len(chanNames)
-minRunTimeToday    = [0] * len(chanNames)
-maxRunTimeToday    = [0] * len(chanNames)
+#
+# Bus capacity. Each bus may spend busUtilization of a tick reading meters,
+# shared with the other buses unless they are read concurrently. A bus with
+# more meters than fit in a tick reads them round robin, so every meter on it
+# is read every busPeriod seconds.
+#
+busSlots = {}       # chanPort : meters read per tick
+busPeriod = {}      # chanPort : seconds between reads of a meter when all are due
+busCapacity = {}    # chanPort : capacity summary
+nextCapacity = 0.
 
-# Yesterday
-cyclesYesterday        = [0] * len(chanNames)
-runTimeYesterday       = [0] * len(chanNames)
-powerConsumedYesterday = [0] * len(chanNames)
-minRunTimeYesterday    = [0] * len(chanNames)
-maxRunTimeYesterday    = [0] * len(chanNames)
+#
+# Seconds per read on a bus, the slowest meter's measured p95 or nominalReadTime.
+# Only answered reads are timed, a meter that never answers is not counted.
+#
+def busReadTime(chanPort, chans) :
+    times = []
+    for chan in chans :
+        stats = pzem.getBusStats(chanPort, chanAddrs[chan])
+        if stats["timed"] :
+            times.append(stats["p95Ms"] / 1000.)
+    return max(max(times), minReadTime) if times else nominalReadTime
+
+
+def updateBusCapacity() :
+    global busSlots, busPeriod, busCapacity
 
+    budget = busUtilization * tInterval
+    if not concurrentBuses :
+        budget = budget / len(chanBuses)
+
+    slots, period, capacity = {}, {}, {}
+    for chanPort, chans in chanBuses.items() :
+        tRead = busReadTime(chanPort, chans)
+        slots[chanPort] = max(1, min(len(chans), int(budget / tRead)))
+        period[chanPort] = -(-len(chans) // slots[chanPort]) * tInterval
+        capacity[chanPort] = {"meters": len(chans), "readMs": tRead * 1000., "slots": slots[chanPort],
+                              "chanHz": 1. / period[chanPort]}
+    busSlots, busPeriod, busCapacity = slots, period, capacity
 
 
 #
-# Trim log files to prevent unbounded growth over years
+# Achievable per-channel rate of each bus
 #
-def trimLogs(logfilename, rows=48*3600/tInterval) :
-    rc = subprocess.call("echo \"$(tail -n " + "{}".format(int(rows)) + " " + logfilename + ")\" > " + logfilename, shell=True)
+def capacityReport() :
+    return ["{}: {} meters, {:.1f} ms/read, {} reads/tick, {:.2f} Hz per channel".format(chanPort, \
+            cap["meters"], cap["readMs"], cap["slots"], cap["chanHz"]) for chanPort, cap in busCapacity.items()]
+
+
+def capacityStatusLine() :
+    if not busCapacity :
+        return ""
+    return "Capacity: {} meters on {} buses, slowest channel {:.2f} Hz".format(len(chanNames), \
+            len(busCapacity), min([cap["chanHz"] for cap in busCapacity.values()]))
+
+
+#
+# Power only fast read flags for the given channels. A full read is due every
+# tFullRead seconds per channel and is then rescheduled.
+#
+def powerOnlyFlags(chans, t) :
+    flags = []
+    for chan in chans :
+        if tFullRead and t < st.nextFullRead[chan] :
+            flags.append(True)
+        else :
+            flags.append(False)
+            st.nextFullRead[chan] = t + tFullRead
+    return flags
+
+
+#
+# Read the given meters on one bus
+#
+def readBus(chanPort, chans) :
+    t0 = profiler.start()
+    readings = pzem.readAcBusPZEM(chanPort, [chanAddrs[chan] for chan in chans], powerOnlyFlags(chans, time.time()))
+    profiler.stop("read", t0, chanPort)
+    return readings
+
+
+#
+# Read all due meters on all buses into the current state lists. Independent
+# buses are read concurrently, one worker per port, so the tick takes about as
+# long as the slowest bus. Results are merged before the accounting step.
+#     returns the list of channels that were read
+#
+busExecutor = None
+
+def readBuses() :
+    return storeReadings(*sampleBuses())
+
+
+#
+# Read all due meters without touching the state lists
+#     returns buses, {chanPort : [reading, ...]}
+#
+def sampleBuses() :
+    global busExecutor
+
+    t0 = profiler.start()
+    buses = dueBuses(time.time())
+
+    if concurrentBuses and len(buses) > 1 :
+        if busExecutor is None :
+            busExecutor = ThreadPoolExecutor(max_workers=len(chanBuses), thread_name_prefix="bus")
+        busReadings = dict(zip(buses, busExecutor.map(readBus, buses, buses.values())))
+    else :
+        busReadings = {chanPort : readBus(chanPort, chans) for chanPort, chans in buses.items()}
+
+    profiler.stop("sample", t0)
+    return buses, busReadings
+
+
+#
+# Merge bus readings into the current state lists. Power only reads leave the
+# other values at those of the last full read. A missed read (None) leaves the
+# channel out of this tick so it is not counted as off. Its next read backs off,
+# doubling per consecutive miss up to readRetryMax, so a meter that does not
+# answer does not hold the bus ahead of live meters.
+#     t is the time of the readings, defaults to now
+#
+def storeReadings(buses, busReadings, t=None) :
+    if t is None :
+        t = time.time()
+
+    chansRead = []
+    for chanPort, chans in buses.items() :
+        for chan, reading in zip(chans, busReadings[chanPort]) :
+            if reading is None :
+                st.readFailures[chan] += 1
+                backoff = min(readRetryMax, tInterval * 2 ** min(st.readFailures[chan], 16))
+                st.nextPoll[chan] = t + max(st.pollInterval[chan], backoff)
+                continue
+
+            st.readFailures[chan] = 0
+            if reading[0] is None :
+                st.power[chan] = reading[2]
+                st.fullRead[chan] = 0
+            else :
+                [st.voltage[chan], st.amperage[chan], st.power[chan], st.energy[chan], st.frequency[chan], \
+                        st.powerFactor[chan], st.alarmStatus[chan]] = reading
+                st.fullRead[chan] = 1
+            chansRead.append(chan)
+    return chansRead
+
+
+#
+# Schedule the next read of a channel. Poll every tInterval while the channel is
+# on or close to its on threshold, otherwise back off to its idle interval.
+#
+def scheduleChan(chan, t) :
+    if st.lastStateOn[chan] or st.power[chan] > idleFraction * chanOnThresholds[chan] :
+        st.pollInterval[chan] = tInterval
+    else :
+        st.pollInterval[chan] = chanIdleIntervals[chan]
+    st.pollInterval[chan] = max(st.pollInterval[chan], busPeriod.get(chanPorts[chan], 0.))
+    st.nextPoll[chan] = t + st.pollInterval[chan]
 
 
 #
@@ -205,6 +422,17 @@ def printRowCol(row,col,arg="") :
     #sys.stdout.write( CSI + str(row) + ";" + str(col) + 'H' + str(arg))
     print(CSI + str(row) + ";" + str(col) + 'H' + str(arg))
 
+#
+# Draw into the screen buffer when the renderer is running, else print
+#
+scr = None
+
+def screenText(row,col,arg="") :
+    if scr is not None :
+        scr.put(row, col, arg)
+    else :
+        printRowCol(row, col, arg)
+
 def formatTime(seconds): 
     # return str(datetime.timedelta(seconds = seconds))
     return time.strftime("%H:%M:%S", time.gmtime(seconds)) 
@@ -216,109 +444,200 @@ def formatLocalTime() :
 
 
 #
-# Read Power
+# Read all meters on all buses from the asyncio loop, one task per bus
 #
-def readPower() :
-    global lastReadTime
-    global lastStateOn, onTime
-    global voltage, amperage, power, energy, frequency, powerFactor, alarmStatus
-    global cycles, runTime, powerConsumed
-    global cyclesToday, runTimeToday, powerConsumedToday, minRunTimeToday, maxRunTimeToday
-    global maxRuntimeLastEmailTime, messageText
+async def readBusesAsync() :
+    t0 = profiler.start()
+    buses = dueBuses(time.time())
 
     t = time.time()
-    timeDelta = (t-lastReadTime)
-    if timeDelta > tInterval*10 :		# Assume first interval is tInterval
-        timeDelta = tInterval
+    busReadings = await asyncio.gather(*[pzem.readAcBusPZEMAsync(chanPort, [chanAddrs[chan] for chan in chans], \
+            powerOnlyFlags(chans, t)) for chanPort, chans in buses.items()])
+    profiler.stop("sample", t0)
 
-    for chan in range(0, len(chanNames)) :
-        [voltage[chan], amperage[chan], power[chan], energy[chan], frequency[chan], powerFactor[chan], \
-                alarmStatus[chan]] = pzem.readAcPZEM(chanPorts[chan], chanAddrs[chan])
+    return storeReadings(buses, dict(zip(buses, busReadings)))
 
-        if (power[chan] > chanOnThresholds[chan]) :
-            detailsLog(chan, voltage[chan], amperage[chan], power[chan], energy[chan], frequency[chan], \
-                    powerFactor[chan], alarmStatus[chan])
 
-            alg.motorStatsAppend(chan, power[chan])
+#
+# Publish a record. From the asyncio loop, sinks are handed to pubScribe's
+# worker so a slow CSV write or SMTP login does not stall sampling.
+#
+def publish(dest, topic, data, hdr="") :
+    if asyncLoopEnabled :
+        pubScribe.pubRecordSoon(dest, topic, data, hdr)
+    elif stages :
+        stages["alerts" if dest == pubScribe.EMAIL_SMS else "sinks"].put((dest, topic, data, hdr))
+    else :
+        pubScribe.pubRecord(dest, topic, data, hdr)
+
 
-            runTime[chan] = runTime[chan] + timeDelta
-            runTimeToday[chan] = runTimeToday[chan] + timeDelta
+#
+# Read Power
+#
+def readPower() :
+    updatePower(readBuses())
 
-            if (lastStateOn[chan]==0) :
-                cycles[chan] = cycles[chan] + 1
-                lastStateOn[chan] = 1
-                cyclesToday[chan] = cyclesToday[chan] + 1
-                onTime[chan] = t		# time motor turned on
 
-            elif (alertMsgEnabled and (t > (runTimeAlert[chan] + onTime[chan]))) :
+#
+# Update state, counters, logs and alerts from the latest readings
+#     chans is the list of channels read this tick. Each channel integrates over
+#     its own interval since its last read, so slow idle polling stays correct.
+#     t is the time of the readings, defaults to now
+#
+def updatePower(chans, t=None) :
+    if t is None :
+        t = time.time()
+
+    t0 = profiler.start()
+    cycleEnds = []
+    for chan in chans :
+        tChan = profiler.start()
+        timeDelta = (t-st.lastReadTime[chan])
+        if timeDelta > st.pollInterval[chan]*10 :		# Assume first interval is the poll interval
+            timeDelta = st.pollInterval[chan]
+
+        if captureBufs :
+            if st.fullRead[chan] :
+                captureBufs[chan].append(t, st.voltage[chan], st.amperage[chan], st.power[chan], \
+                        st.powerFactor[chan], st.frequency[chan])
+            else :
+                # Power only poll, the other values were not read
+                captureBufs[chan].append(t, math.nan, math.nan, st.power[chan], math.nan, math.nan)
+
+        if (st.power[chan] > chanOnThresholds[chan]) :
+            if detailsLogEnabled :
+                detailsLog(chan, st.voltage[chan], st.amperage[chan], st.power[chan], st.energy[chan], \
+                        st.frequency[chan], st.powerFactor[chan], st.alarmStatus[chan])
+
+            alg.motorStatsAppend(chan, t, st.power[chan])
+
+            # On time is counted from this read, as for onTime, even after a slow idle poll
+            rtDelta = timeDelta if st.lastStateOn[chan] else min(timeDelta, tInterval)
+            st.runTime[chan] = st.runTime[chan] + rtDelta
+            st.runTimeToday[chan] = st.runTimeToday[chan] + rtDelta
+
+            if (st.lastStateOn[chan]==0) :
+                st.cycles[chan] = st.cycles[chan] + 1
+                st.lastStateOn[chan] = 1
+                st.cyclesToday[chan] = st.cyclesToday[chan] + 1
+                st.onTime[chan] = t		# time motor turned on
+
+            elif (t > (runTimeAlert[chan] + st.onTime[chan])) :
                 # Motor on time exceeded threshold
-                if (t > (minIntervalBtwEmails[chan])+maxRuntimeLastEmailTime[chan]) :
+                s = chanNames[chan] + " on time exceeded!"
+
+                # Captured once, on the read that crosses the limit
+                if st.lastReadTime[chan] <= runTimeAlert[chan] + st.onTime[chan] :
+                    captureChan(chan, s)
+
+                if alertMsgEnabled and (t > (minIntervalBtwEmails[chan])+st.maxRuntimeLastEmailTime[chan]) :
                     # Allowed to send email text message
-                    maxRuntimeLastEmailTime[chan] = t
-                    s = chanNames[chan] + " on time exceeded!"
+                    st.maxRuntimeLastEmailTime[chan] = t
                     sendAlert(chanNames[chan], s)
 
-        elif lastStateOn[chan] :
-            lastStateOn[chan] = 0
-
-            rt = t - onTime[chan]
-            if minRunTimeToday[chan] == 0 :
-                minRunTimeToday[chan] = rt
-            elif rt < minRunTimeToday[chan] :
-                minRunTimeToday[chan] = rt
+        elif st.lastStateOn[chan] :
+            st.lastStateOn[chan] = 0
 
-            if rt > maxRunTimeToday[chan] :
-                maxRunTimeToday[chan] = rt
+            rt = t - st.onTime[chan]
+            if st.minRunTimeToday[chan] == 0 :
+                st.minRunTimeToday[chan] = rt
+            elif rt < st.minRunTimeToday[chan] :
+                st.minRunTimeToday[chan] = rt
 
-            hdr, returnStr, alertMsg = alg.motorStats(chan, chanNames, rt, tInterval)
+            if rt > st.maxRunTimeToday[chan] :
+                st.maxRunTimeToday[chan] = rt
 
-            timeStr = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            messageText = "{:.2f},{},{}\n{}".format(t, timeStr, returnStr+"        ",alertMsg+"     ")
+            tStats = profiler.start()
+            hdr, returnStr, meanPwr = alg.cycleSummary(chan, chanNames, rt, tInterval)
+            profiler.stop("motorStats", tStats, chanNames[chan])
 
-            if returnStr!="" :
-                topic = "energyMaster/logStats_" + chanNames[chan]
-                pubScribe.pubRecord(pubScribe.CSV_FILE, topic, returnStr, hdr)
+            # Scored after the loop, all channels that stopped this tick in one call
+            if meanPwr is not None :
+                cycleEnds.append((chan, rt, meanPwr, hdr, returnStr))
+            else :
+                cycleEnd(chan, t, hdr, returnStr, "")
 
-            if alertMsg!="" and alertMsgEnabled and (t > (minIntervalBtwEmails[chan])+algLastEmailTime[chan]) :
-                # Allowed to send email text message
-                algLastEmailTime[chan] = t
-                sendAlert(chanNames[chan], alertMsg)
+        if st.lastReadTime[chan] :
+            # Trapezoid, intervals between reads are uneven
+            pwr = (st.lastPower[chan] + st.power[chan]) * timeDelta/7200.
+            st.powerConsumed[chan] = st.powerConsumed[chan] + pwr
+            st.powerConsumedToday[chan] = st.powerConsumedToday[chan] + pwr
 
-        if lastReadTime :
-            pwr = power[chan] * timeDelta/3600.
-            powerConsumed[chan] = powerConsumed[chan] + pwr
-            powerConsumedToday[chan] = powerConsumedToday[chan] + pwr
+        st.lastReadTime[chan] = t
+        st.lastPower[chan] = st.power[chan]
+        scheduleChan(chan, t)
+        profiler.stop("account", tChan, chanNames[chan])
 
     # end for
 
-    lastReadTime = t
+    if cycleEnds :
+        tScore = profiler.start()
+        alertMsgs = alg.calAlgBatch([c[0] for c in cycleEnds], [c[2] for c in cycleEnds], [c[1] for c in cycleEnds])
+        profiler.stop("score", tScore)
+
+        for (chan, rt, meanPwr, hdr, returnStr), alertMsg in zip(cycleEnds, alertMsgs) :
+            cycleEnd(chan, t, hdr, returnStr, alertMsg)
+
+    profiler.stop("account", t0)
+
+
+#
+# Log, capture and alert for a cycle that ended at time t
+#
+def cycleEnd(chan, t, hdr, returnStr, alertMsg) :
+    global messageText
+
+    timeStr = datetime.datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    messageText = "{:.2f},{},{}\n{}".format(t, timeStr, returnStr+"        ",alertMsg+"     ")
+
+    if returnStr!="" :
+        topic = "energyMaster/logStats_" + chanNames[chan]
+        publish(pubScribe.CSV_FILE, topic, returnStr, hdr)
+
+    if alertMsg!="" :
+        captureChan(chan, alertMsg)
+
+    if alertMsg!="" and alertMsgEnabled and (t > (minIntervalBtwEmails[chan])+st.algLastEmailTime[chan]) :
+        # Allowed to send email text message
+        st.algLastEmailTime[chan] = t
+        sendAlert(chanNames[chan], alertMsg)
+
+
+#
+# Clear the message rows before sending. With the screen renderer running the
+# rows belong to it, it is told to redraw instead of being written around.
+#
+def clearMessages() :
+    if scr is not None :
+        scr.invalidate()
+    elif displayEnabled :
+        printRowCol(messageRow,0,"")
+        clearDown()
 
 
 #
 # Send alert via email to another email or as SMS text
 #
 def sendAlert(subj, alertMsg) :
-    printRowCol(messageRow,0,"")
-    clearDown()
+    clearMessages()
     topic = "energyMaster/Alert"
-    pubScribe.pubRecord(pubScribe.EMAIL_SMS, topic, alertMsg)
+    publish(pubScribe.EMAIL_SMS, topic, alertMsg)
 
 
 #
 # Send status via email to another email or as SMS text
 #
 def sendStatus() :
-    printRowCol(messageRow,0,"")
-    clearDown()
+    clearMessages()
     statusMsg = "Yesterday summary: \n"
     for chan in range(0, len(chanNames)) :
-        statusMsg += chanNames[chan] + " Cycles: {:<5.0f} \n".format(cyclesYesterday[chan])
-        statusMsg += "MinRunTime: " + formatTime(minRunTimeYesterday[chan]) + '\n'
-        statusMsg += "MaxRunTime: " + formatTime(maxRunTimeYesterday[chan]) + '\n'
-        statusMsg += "TotalRunTime: " + formatTime(runTimeYesterday[chan]) + '\n'
-        statusMsg += "Power (Wh): {:<8.2f} \n\n".format(powerConsumedYesterday[chan])
+        statusMsg += chanNames[chan] + " Cycles: {:<5.0f} \n".format(st.cyclesYesterday[chan])
+        statusMsg += "MinRunTime: " + formatTime(st.minRunTimeYesterday[chan]) + '\n'
+        statusMsg += "MaxRunTime: " + formatTime(st.maxRunTimeYesterday[chan]) + '\n'
+        statusMsg += "TotalRunTime: " + formatTime(st.runTimeYesterday[chan]) + '\n'
+        statusMsg += "Power (Wh): {:<8.2f} \n\n".format(st.powerConsumedYesterday[chan])
     topic = "energyMaster/Status"
-    pubScribe.pubRecord(pubScribe.EMAIL_SMS, topic, statusMsg)
+    publish(pubScribe.EMAIL_SMS, topic, statusMsg)
 
 
 #
@@ -332,11 +651,11 @@ def energyLog():
 
     s = ""
     for chan in range(0, len(chanNames)) :
-        s += str(round(cycles[chan])) + "," + str(round(powerConsumed[chan], 2)) + ","
+        s += str(round(st.cycles[chan])) + "," + str(round(st.powerConsumed[chan], 2)) + ","
     s = s[:-1]
 
     topic = "energyMaster/logEnergy"
-    pubScribe.pubRecord(pubScribe.CSV_FILE, topic, s, hdr)
+    publish(pubScribe.CSV_FILE, topic, s, hdr)
 
 
 #
@@ -346,113 +665,401 @@ def detailsLog(chan, voltage, amperage, power, energy, frequency, powerFactor, a
     hdr = 'Volts,Amps,Watts,Energy (Wh),Freq (Hz),PF,Status'
     s = "{:.0f},{:.1f},{:.1f},{:.1f},{:.1f},{:.1f},{:.1f},{:.0f}".format(chan, voltage, amperage, power, energy, frequency, powerFactor, alarmStatus)
     topic = "energyMaster/logDetails_" + chanNames[chan]
-    pubScribe.pubRecord(pubScribe.CSV_FILE, topic, s, hdr)
+    publish(pubScribe.CSV_FILE, topic, s, hdr)
+
+
+#
+# Dump a channel's ring buffer to a capture file. The buffer is copied here and
+# written by its own stage.
+#
+captureStage = None
+
+def captureChan(chan, reason) :
+    global captureStage
+
+    if not captureBufs :
+        return
+    if captureStage is None :
+        captureStage = pipeline.Stage("capture", writeCapture, 8, pipeline.DROP_NEWEST)
+        captureStage.start()
+    fileName = "energyMaster_capture_" + chanNames[chan] + "_" + time.strftime('%Y%m%d-%H%M%S') + ".bin"
+    captureStage.put((fileName, chanNames[chan], reason, captureBufs[chan].snapshot()))
+
+
+def writeCapture(capture) :
+    t0 = profiler.start()
+    captureBuffer.dump(*capture)
+    profiler.stop("capture", t0)
+
+
+def stopCapture() :
+    if captureStage is not None :
+        captureStage.stop()
 
 
 #
-# Start timer
+# Start the tInterval scheduler thread
 #
+sched = None
+tickStats = None        # scheduler.TickStats of the running loop
+
 def startTimer():
-    global timer
-    t = datetime.datetime.now()
-    Timer(tInterval - (t.microsecond/1000000.)%tInterval, myTimer).start()	# next tInterval seconds
+    global sched, tickStats
+    sched = scheduler.Scheduler(tInterval, myTimer)
+    tickStats = sched.stats
+    sched.start()
+
+
+def stopTimer():
+    if sched is not None :
+        sched.stop()
+        sched.join()
 
 
 #
-# tInterval timer
+# tInterval tick, called by the scheduler thread
 #
 stopFlag = 0
 
 def myTimer() :
-    global timer
-
-    global lastReadTime
-    global voltage, amperage, power, energy, frequency, powerFactor, alarmStatus
-    global cycles, runTime, powerConsumed
-    global cyclesLastInterval, runTimeLastInterval, powerConsumedLastInterval
-    global cyclesToday, runTimeToday, powerConsumedToday, minRunTimeToday, maxRunTimeToday
-    global cyclesYesterday, runTimeYesterday, powerConsumedYesterday, minRunTimeYesterday, maxRunTimeYesterday
-   
     t = datetime.datetime.now()
-    firstSec = t.microsecond < (tInterval*1000000./2.)
+    if stages :
+        buses, busReadings = sampleBuses()
+        stages["accounting"].put((time.time(), t, buses, busReadings))
+        return
 
-    # move TODAY data to YESTERDAY
-    if (t.hour==0 and t.minute==0 and t.second==0 and firstSec) :
-        runTimeYesterday = runTimeToday
-        runTimeToday = [0] * len(chanNames)
+    periodicTasks(t)
 
-        cyclesYesterday = cyclesToday
-        cyclesToday = [0] * len(chanNames)
+    readPower()
 
-        powerConsumedYesterday = powerConsumedToday
-        powerConsumedToday = [0] * len(chanNames)
+    if displayDue(t) :
+        displayAll()
 
-        minRunTimeYesterday = minRunTimeToday
-        minRunTimeToday = [0] * len(chanNames)
 
-        maxRunTimeYesterday = maxRunTimeToday
-        maxRunTimeToday = [0] * len(chanNames)
+#
+# Pipeline stages. The scheduler thread only reads meters and queues a sample
+# record (read time, tick time, buses, readings). Accounting owns the state
+# lists and feeds the sink, alert and display stages, each bounded with its own
+# policy so a stalled SMTP login or slow terminal costs drops, not ticks.
+#     name : (maxSize, policy)
+#
+STAGES = {"accounting" : (256, pipeline.DROP_OLDEST),     # Newest samples win, integration spans the gap
+          "sinks" : (1024, pipeline.DROP_NEWEST),         # CSV, MQTT and InfluxDB records
+          "alerts" : (32, pipeline.DROP_NEWEST),          # Email / SMS, already rate limited per channel
+          "display" : (1, pipeline.DROP_OLDEST)}          # Only the latest refresh matters
+
+stages = {}
+
+def startPipeline() :
+    handlers = {"accounting" : accountSample, "sinks" : sinkRecord, "alerts" : sinkRecord, \
+            "display" : lambda item : displayAll()}
+    for name, (maxSize, policy) in STAGES.items() :
+        stages[name] = pipeline.Stage(name, handlers[name], maxSize, policy)
+    for stage in stages.values() :
+        stage.start()
+
+
+#
+# Stop producers first so every queue drains into its consumers
+#
+def stopPipeline() :
+    for name in STAGES :
+        if name in stages :
+            stages[name].stop()
+    stages.clear()
+
+
+def accountSample(sample) :
+    t, tickTime, buses, busReadings = sample
+    if profiler.enabled :
+        profiler.add("queueWait", time.time() - t)
+    periodicTasks(tickTime)
+    updatePower(storeReadings(buses, busReadings, t), t)
+
+    if displayDue(tickTime) :
+        stages["display"].put(None)
+
+
+def sinkRecord(record) :
+    t0 = profiler.start()
+    pubScribe.pubRecord(*record)
+    profiler.stop("alert" if pubScribe.EMAIL_SMS in record[0] else "sink", t0)
+
+
+#
+# Pipeline drop summary line
+#
+def pipelineStatusLine() :
+    if not stages :
+        return ""
+    s = "Queue drops/depth: " + "  ".join(["{} {}/{}".format(name, stage.dropped, len(stage.items)) \
+            for name, stage in stages.items()])
+    if checkpoint.stats["saves"] :
+        s = s + "  checkpoint ms: {:.2f}/{:.1f}".format(checkpoint.stats["snapshotMs"], checkpoint.stats["writeMs"])
+    return s
+
+
+#
+# asyncio alternative to the scheduler thread. A single event loop sleeps to
+# absolute tInterval deadlines, reads every bus as a concurrent task and hands
+# sinks to pubScribe's worker, so no thread is created per tick.
+#
+async def asyncTimer() :
+    global tickStats
+    tickStats = scheduler.TickStats(tInterval)
+    deadline = scheduler.alignedDeadline(tInterval)
+
+    while not stopFlag :
+        await asyncio.sleep(max(0., deadline - time.monotonic()))
+        tickStats.started(time.monotonic() - deadline)
+
+        t = datetime.datetime.now()
+        periodicTasks(t)
+
+        updatePower(await readBusesAsync())
+
+        if displayDue(t) :
+            displayAll()
+
+        deadline = tickStats.finished(deadline, time.monotonic())
+
+
+#
+# Day rollover, status email and energy log. Each fires when its boundary was
+# crossed since the previous tick, so a late or skipped tick does not lose it.
+#
+lastTaskTime = None
+
+def logSlot(t) :
+    return t.date(), t.hour, t.minute // tLog
+
+
+def periodicTasks(t) :
+    global lastTaskTime, nextCapacity, nextProfile
+
+    prev = lastTaskTime
+    lastTaskTime = t
+    if prev is None :
+        return
+
+    t0 = profiler.start()
+
+    # move TODAY data to YESTERDAY
+    if t.date() != prev.date() :
+        st.rollover(chanState.DAY_ROLLOVER)
 
     # send daily status email to email or to SMS text
-    if (statusMsgEnabled and t.hour==statusMsgHHMM[0] and t.minute==statusMsgHHMM[1] and t.second==5 and firstSec) :
+    statusTime = t.replace(hour=statusMsgHHMM[0], minute=statusMsgHHMM[1], second=5, microsecond=0)
+    if statusMsgEnabled and prev < statusTime <= t :
         sendStatus()
-    
+
     # log data and reset counters
-    elif ((not (t.minute%tLog)) and (t.second==0) and firstSec) :
+    if logSlot(t) != logSlot(prev) :
         energyLog()
 
         # copy counters to LastInterval and reset counters
-        cyclesLastInterval = cycles
-        cycles = [0] * len(chanNames)
+        st.rollover(chanState.INTERVAL_ROLLOVER)
 
-        runTimeLastInterval = runTime
-        runTime = [0] * len(chanNames)
+    if time.time() >= nextCapacity :
+        nextCapacity = time.time() + capacityInterval
+        updateBusCapacity()
 
-        powerConsumedLastInterval = powerConsumed
-        powerConsumed = [0] * len(chanNames)
+    if checkpointInterval and time.time() >= nextCheckpoint :
+        saveCheckpoint(time.time())
 
-    # need to add trim daily log files here
+    profiler.stop("periodic", t0)
 
-    # read power, skips some intervals to minimize processor load but accounts for double tInterval
-    else :
-        readPower()
+    if profiler.enabled and time.time() >= nextProfile :
+        nextProfile = time.time() + profileInterval
+        logProfile()
 
-        if firstSec :
-            clearWindow()
-            displayLabels()
-            display()
-            displayLastInterval()
-            displayYesterday()
-            printRowCol(messageRow,0,messageText+"        ")
 
-    if not stopFlag :
-        t = datetime.datetime.now()
-        Timer(tInterval - (t.microsecond/1000000.)%tInterval, myTimer).start()	# every tInterval seconds
+#
+# Stage timing records, one per stage and per bus or channel key
+#
+nextProfile = 0.
+
+def logProfile() :
+    topic = "energyMaster/logProfile"
+    for row in profiler.summary() :
+        publish(pubScribe.CSV_FILE + pubScribe.MQTT, topic, row)
+
+
+#
+# Checkpoints. The state is packed on the thread that owns it, after any
+# rollover, and the file is written by its own stage so a slow SD card never
+# delays a tick. A newer snapshot replaces one still waiting to be written.
+#
+checkpointStage = None
+nextCheckpoint = 0.
+
+def saveCheckpoint(t) :
+    global checkpointStage, nextCheckpoint
+
+    nextCheckpoint = t + checkpointInterval
+    if checkpointStage is None :
+        checkpointStage = pipeline.Stage("checkpoint", writeCheckpoint, 1, pipeline.DROP_OLDEST)
+        checkpointStage.start()
+    checkpointStage.put(checkpoint.snapshot(st, chanNames, [stats.state() for stats in alg.cycleStats], t))
+
+
+def writeCheckpoint(data) :
+    t0 = profiler.start()
+    checkpoint.write(checkpointFileName, data)
+    profiler.stop("checkpoint", t0)
+
+
+#
+# Flush the pending checkpoint, then write a final one
+#
+def stopCheckpoint() :
+    if checkpointStage is not None :
+        checkpointStage.stop()
+    if checkpointInterval :
+        writeCheckpoint(checkpoint.snapshot(st, chanNames, [stats.state() for stats in alg.cycleStats]))
+
+
+#
+# Restore counters and cycles in progress. Power during the restart gap is
+# unknown, so no energy is integrated across it and every channel is read on
+# the first tick. A cycle in progress continues only after a short gap. Day,
+# status and log interval boundaries crossed while stopped fire on the first
+# tick, as for a late tick.
+#
+def restoreCheckpoint() :
+    global lastTaskTime
+
+    series = [[] for _ in range(len(chanNames))]
+    savedAt = checkpoint.restore(checkpointFileName, st, chanNames, series)
+    if savedAt is None :
+        return
+    for stats, values in zip(alg.cycleStats, series) :
+        if values :
+            stats.restore(values)
+
+    st.reset(("lastReadTime", "lastPower", "nextPoll", "nextFullRead"))
+
+    gap = time.time() - savedAt
+    if gap > checkpointMaxGap :
+        st.reset(("lastStateOn", "onTime"))
+        for stats in alg.cycleStats :
+            stats.restart()
+
+    # Stopped for more than a day, nothing carries over to yesterday
+    if (datetime.date.today() - datetime.date.fromtimestamp(savedAt)).days > 1 :
+        st.reset([current for current, previous in chanState.DAY_ROLLOVER])
+
+    lastTaskTime = datetime.datetime.fromtimestamp(savedAt)
+
+    print("Restored " + checkpointFileName + " in {:.2f} ms, gap {:.0f} s".format(checkpoint.stats["restoreMs"], gap))
+
+
+#
+# Display is refreshed on the first tick of each second
+#
+lastDisplaySec = None
+
+def displayDue(t) :
+    global lastDisplaySec
+
+    if not displayEnabled or displayThreaded :
+        return False
+    sec = t.replace(microsecond=0)
+    if sec == lastDisplaySec :
+        return False
+    lastDisplaySec = sec
+    return True
+
+
+#
+# Tick timing summary line
+#
+def tickStatusLine() :
+    if tickStats is None :
+        return ""
+    stats = tickStats.summary()
+    return "Ticks: {}  late: {}  overruns: {}  skipped: {}  jitter ms mean/p95/max: {:.1f}/{:.1f}/{:.1f}".format( \
+            stats["ticks"], stats["late"], stats["overruns"], stats["skipped"], \
+            stats["jitterMeanMs"], stats["jitterP95Ms"], stats["jitterMaxMs"])
+
+
+#
+# Refresh the whole display
+#
+def displayAll() :
+    t0 = profiler.start()
+    if scr is not None :
+        scr.clear()
+    else :
+        clearWindow()
+
+    pages = nextPage()
+    displayLabels()
+    display()
+    displayLastInterval()
+    displayYesterday()
+    if pages > 1 :
+        screenText(messageRow-3,0,capacityStatusLine() + "  page {}/{}".format(displayPage+1, pages))
+    else :
+        screenText(messageRow-3,0,capacityStatusLine())
+    screenText(messageRow-4,0,profiler.statusLine())
+    screenText(messageRow-2,0,pipelineStatusLine())
+    screenText(messageRow-1,0,tickStatusLine())
+    screenText(messageRow,0,messageText+"        ")
 
+    if scr is not None :
+        scr.render()
+    profiler.stop("display", t0)
 
 
 COL_WIDTH = 10    # Column spacing between motors
 
+#
+# Channel pages. When the channels do not fit across the terminal the display
+# steps through pages of them every pageSeconds.
+#
+displayPage = 0
+
+def chansPerPage() :
+    return max(1, (shutil.get_terminal_size().columns - 20) // COL_WIDTH)
+
+
+def nextPage() :
+    global displayPage
+
+    pages = -(-len(chanNames) // chansPerPage())
+    displayPage = int(time.time() // pageSeconds) % pages
+    return pages
+
+
+#
+# Channels on the current page with their display column
+#     returns [(chan, col), ...]
+#
+def pageChans() :
+    perPage = chansPerPage()
+    first = displayPage * perPage
+    return [(chan, 20 + COL_WIDTH * (chan - first)) for chan in range(first, min(first + perPage, len(chanNames)))]
+
 #
 # Display row and column headers
 #
 def displayLabels() :
     lbl = ["Time: ", "Voltage (V)     :","Amperage (A)    :","Power (W)       :",
-        "Frequency (Hz)  :","PowerFactor     :","State           : ","",
+        "Frequency (Hz)  :","PowerFactor     :","State           : ","Read ms / errors:",
         "Current interval ", "          cycles: ",  "      run time  : ",  "      power (Wh): ", "",
         "Last interval ", "          cycles: ",  "      run time  : ",  "      power (Wh): ", "",
         "Today ", "          cycles: ", "    min run time: ", "    max run time: ", "  total run time: ",  "      power (Wh): ", "",
         "Yesterday ", "          cycles: ", "    min run time: ", "    max run time: ", "  total run time: ",  "      power (Wh): ", ""]
 
     # Column headings
-    for chan in range(0, len(chanNames)) :
-        col = 20 + COL_WIDTH * chan
-        printRowCol(0,col,chanNames[chan])
+    for chan, col in pageChans() :
+        screenText(0,col,chanNames[chan])
 
     # Row headings
     row = 1
     for item in lbl :
-        printRowCol(row,0,item)
+        screenText(row,0,item)
         row = row + 1
 
 
@@ -461,67 +1068,74 @@ def displayLabels() :
 #
 def display() :
     # Display current time
-    printRowCol(0, 7, time.strftime("%H:%M:%S", time.localtime()))
+    screenText(0, 7, time.strftime("%H:%M:%S", time.localtime()))
     
-    for chan in range(0, len(chanNames)) :
-        col = 20 + COL_WIDTH * chan
+    for chan, col in pageChans() :
         # Display instantaneous
-        printRowCol(2, col, "{: 8.1f}  ".format(voltage[chan]))
-        printRowCol(3, col, "{: 8.3f}  ".format(amperage[chan]))
-        printRowCol(4, col, "{: 8.1f}  ".format(power[chan]))
-        printRowCol(5, col, "{: 8.1f}  ".format(frequency[chan]))
-        printRowCol(6, col, "{: 8.2f}  ".format(powerFactor[chan]))
-        printRowCol(7, col, "{: 8.0f}  ".format(lastStateOn[chan]))
+        screenText(2, col, "{: 8.1f}  ".format(st.voltage[chan]))
+        screenText(3, col, "{: 8.3f}  ".format(st.amperage[chan]))
+        screenText(4, col, "{: 8.1f}  ".format(st.power[chan]))
+        screenText(5, col, "{: 8.1f}  ".format(st.frequency[chan]))
+        screenText(6, col, "{: 8.2f}  ".format(st.powerFactor[chan]))
+        screenText(7, col, "{: 8.0f}  ".format(st.lastStateOn[chan]))
+        stats = pzem.getBusStats(chanPorts[chan], chanAddrs[chan])
+        screenText(8, col, "{:4.0f}/{:<4d}".format(stats["meanMs"], stats["errors"]))
 
         # Display CURRENT INTERVAL
-        printRowCol(10, col, "{:<5.0f} ".format(cycles[chan]))
-        printRowCol(11, col, formatTime(runTime[chan]))
-        printRowCol(12, col, "{:<8.2f} ".format(powerConsumed[chan]))
+        screenText(10, col, "{:<5.0f} ".format(st.cycles[chan]))
+        screenText(11, col, formatTime(st.runTime[chan]))
+        screenText(12, col, "{:<8.2f} ".format(st.powerConsumed[chan]))
 
         # Display TODAY
-        printRowCol(20, col, "{:<5.0f} ".format(cyclesToday[chan]))
-        printRowCol(21, col, formatTime(minRunTimeToday[chan]))
-        printRowCol(22, col, formatTime(maxRunTimeToday[chan]))
-        printRowCol(23, col, formatTime(runTimeToday[chan]))
-        printRowCol(24, col, "{:<8.2f} ".format(powerConsumedToday[chan]))
+        screenText(20, col, "{:<5.0f} ".format(st.cyclesToday[chan]))
+        screenText(21, col, formatTime(st.minRunTimeToday[chan]))
+        screenText(22, col, formatTime(st.maxRunTimeToday[chan]))
+        screenText(23, col, formatTime(st.runTimeToday[chan]))
+        screenText(24, col, "{:<8.2f} ".format(st.powerConsumedToday[chan]))
 
 
 #
 # Update display of LAST INTERVAL
 #
 def displayLastInterval() :
-    for chan in range(0, len(chanNames)) :
-        col = 20 + COL_WIDTH * chan
-        printRowCol(15, col, "{:<5.0f} ".format(cyclesLastInterval[chan]))
-        printRowCol(16, col, formatTime(runTimeLastInterval[chan]))
-        printRowCol(17, col, "{:<8.2f} ".format(powerConsumedLastInterval[chan]))
+    for chan, col in pageChans() :
+        screenText(15, col, "{:<5.0f} ".format(st.cyclesLastInterval[chan]))
+        screenText(16, col, formatTime(st.runTimeLastInterval[chan]))
+        screenText(17, col, "{:<8.2f} ".format(st.powerConsumedLastInterval[chan]))
 
 
 #
 # Update display of YESTERDAY
 #
 def displayYesterday() :
-    for chan in range(0, len(chanNames)) :
-        col = 20 + COL_WIDTH * chan
-        printRowCol(27, col, "{:<5.0f} ".format(cyclesYesterday[chan]))
-        printRowCol(28, col, formatTime(minRunTimeYesterday[chan]))
-        printRowCol(29, col, formatTime(maxRunTimeYesterday[chan]))
-        printRowCol(30, col, formatTime(runTimeYesterday[chan]))
-        printRowCol(31, col, "{:<8.2f} ".format(powerConsumedYesterday[chan]))
+    for chan, col in pageChans() :
+        screenText(27, col, "{:<5.0f} ".format(st.cyclesYesterday[chan]))
+        screenText(28, col, formatTime(st.minRunTimeYesterday[chan]))
+        screenText(29, col, formatTime(st.maxRunTimeYesterday[chan]))
+        screenText(30, col, formatTime(st.runTimeYesterday[chan]))
+        screenText(31, col, "{:<8.2f} ".format(st.powerConsumedYesterday[chan]))
     
 
 #---------------------------------------------------------------------------
 if __name__ == '__main__':
 
-    min_tInterval = 1./(10//len(chanNames))
+    # A tick must fit at least one read per bus
+    min_tInterval = nominalReadTime / busUtilization
     if tInterval < min_tInterval :
         tInterval = min_tInterval
         print("Setting tInterval to: " + str(tInterval))
         time.sleep(3)
 
-    clearWindow()
-    displayLabels()
-    print("\nPress CTRL+C to exit...\nMake sure text window is large enough to avoid scrolling.\n")
+    updateBusCapacity()
+    if max([cap["meters"] - cap["slots"] for cap in busCapacity.values()]) > 0 :
+        print("Buses with more meters than fit in a tick are read round robin:")
+        print("\n".join(capacityReport()))
+        time.sleep(3)
+
+    if displayEnabled :
+        clearWindow()
+        displayLabels()
+        print("\nPress CTRL+C to exit...\nMake sure text window is large enough to avoid scrolling.\n")
 
     if (len(chanNames) > len(chanPorts)) or (len(chanNames) > len(chanAddrs)) or (len(chanNames) > len(chanOnThresholds)) :
         print("ERROR: number of chanNames and chanPorts or chanOnThresholds")
@@ -538,20 +1152,49 @@ if __name__ == '__main__':
         pubScribe.pubRecord(pubScribe.EMAIL_SMS, topic, "Program start")
     """
 
-    alg.calAlgInit(chanNames)
+    profiler.enabled = bool(profileEnabled)
+
+    alg.calAlgInit(chanNames, tInterval)
+    if checkpointInterval :
+        restoreCheckpoint()
 
-    startTimer()
+    displaySched = None
+    if displayEnabled :
+        scr = screen.Screen()
+        if displayThreaded :
+            displaySched = scheduler.Scheduler(displayInterval, displayAll)
+            displaySched.start()
 
     try:
-        while(True):
-            time.sleep(1)
+        if asyncLoopEnabled :
+            asyncio.run(asyncTimer())
+
+        else :
+            if pipelineEnabled :
+                startPipeline()
+            startTimer()
+
+            while(True):
+                time.sleep(1)
 
     except KeyboardInterrupt:
-        #timer.cancel()
         stopFlag = 1
+        stopTimer()
+        stopPipeline()
+        if displaySched is not None :
+            displaySched.stop()
+            displaySched.join()
 
         clearDown()
         print("Exiting...")
 
+    if busExecutor is not None :
+        busExecutor.shutdown()
+    stopCheckpoint()
+    stopCapture()
+    alg.flushCfg()
+    pubScribe.shutdownWorker()
+    pzem.closeAllClients()
+
     pubScribe.disconnectPubScribe()
 
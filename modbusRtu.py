@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Minimal Modbus RTU master for the PZEM modules. Only the two function codes
+    the modules need are implemented:
+        0x04  Read input registers
+        0x06  Write single register
+
+    The CRC16 uses a precomputed table, request frames are built once per
+    (unit, address, count) and cached, and responses are returned as a
+    memoryview so the caller can decode every register with one
+    struct.unpack_from() call. This avoids the per-read request/response
+    objects of pymodbus on slow ARM boards.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import time
+import struct
+
+import serial
+
+
+READ_INPUT_REGISTERS = 0x04
+WRITE_SINGLE_REGISTER = 0x06
+
+
+#
+# CRC16 (Modbus, polynomial 0xA001 reflected), table driven
+#
+def crcTableInit() :
+    table = []
+    for n in range(256) :
+        crc = n
+        for i in range(8) :
+            if crc & 1 :
+                crc = (crc >> 1) ^ 0xA001
+            else :
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+CRC_TABLE = crcTableInit()
+
+
+def crc16(data) :
+    crc = 0xFFFF
+    for b in data :
+        crc = (crc >> 8) ^ CRC_TABLE[(crc ^ b) & 0xFF]
+    return crc
+
+
+#
+# Errors
+#
+class ModbusRtuError(Exception) :
+    pass
+
+class NoResponseError(ModbusRtuError) :
+    pass
+
+class CrcError(ModbusRtuError) :
+    pass
+
+class ExceptionResponse(ModbusRtuError) :
+    pass
+
+
+#
+# Frame building, CRC is appended low byte first
+#
+def buildFrame(unit, function, address, value) :
+    frame = struct.pack('>BBHH', unit, function, address, value)
+    return frame + struct.pack('<H', crc16(frame))
+
+
+#
+# Serial RTU master
+#     port, baudrate and stopbits as for pymodbus ModbusSerialClient
+#     timeout is the response timeout in seconds
+#
+class RtuClient :
+    def __init__(self, port, baudrate=9600, stopbits=1, timeout=0.5) :
+        self.port = port
+        self.baudrate = baudrate
+        self.stopbits = stopbits
+        self.timeout = timeout
+        self.serial = None
+        self.requests = {}                 # (unit, function, address, value) : frame
+
+        # 3.5 character silent interval between frames, 1 start + 8 data + stop bits
+        self.silentInterval = 3.5 * (9 + stopbits) / baudrate
+        self.lastFrameEnd = 0
+
+    def connect(self) :
+        if not self.is_socket_open() :
+            self.close()
+            try :
+                self.serial = serial.Serial(port=self.port, baudrate=self.baudrate, bytesize=8, parity='N', \
+                        stopbits=self.stopbits, timeout=self.timeout)
+            except serial.SerialException as e :
+                print('Exception opening ' + self.port + ': ' + str(e))
+                self.serial = None
+        return self.serial is not None
+
+    def close(self) :
+        if self.serial is not None :
+            self.serial.close()
+            self.serial = None
+
+    def is_socket_open(self) :
+        return self.serial is not None and self.serial.is_open
+
+    #
+    # Send a request frame and return the validated response frame as a memoryview
+    #     respLen is the length of a normal response including CRC
+    #
+    def transact(self, key, respLen) :
+        frame = self.requests.get(key)
+        if frame is None :
+            frame = buildFrame(*key)
+            self.requests[key] = frame
+
+        wait = self.lastFrameEnd + self.silentInterval - time.monotonic()
+        if wait > 0 :
+            time.sleep(wait)
+
+        self.serial.reset_input_buffer()
+        self.serial.write(frame)
+
+        # Exception responses are 5 bytes, read those first
+        resp = self.serial.read(5)
+        if len(resp) == 5 and not (resp[1] & 0x80) :
+            resp += self.serial.read(respLen - 5)
+        self.lastFrameEnd = time.monotonic()
+
+        if len(resp) < 5 :
+            raise NoResponseError('No response from unit ' + str(key[0]))
+
+        # A frame cut short is a timeout, not a CRC error
+        if len(resp) != (5 if resp[1] & 0x80 else respLen) :
+            raise NoResponseError('Short response from unit ' + str(key[0]))
+
+        mv = memoryview(resp)
+        if crc16(mv[:-2]) != (mv[-2] | (mv[-1] << 8)) :
+            raise CrcError('CRC error from unit ' + str(key[0]))
+
+        if resp[1] & 0x80 :
+            raise ExceptionResponse('Exception code ' + str(resp[2]) + ' from unit ' + str(key[0]))
+
+        if resp[0] != key[0] or resp[1] != key[1] :
+            raise NoResponseError('Unexpected response from unit ' + str(key[0]))
+
+        return mv
+
+    #
+    # Function 0x04, register data starts at offset 3 of the returned frame
+    #
+    def readInputRegisters(self, unit, address, count) :
+        return self.transact((unit, READ_INPUT_REGISTERS, address, count), 5 + 2*count)
+
+    #
+    # Function 0x06, response echoes the request
+    #
+    def writeRegister(self, unit, address, value) :
+        return self.transact((unit, WRITE_SINGLE_REGISTER, address, value), 8)
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    # Read input registers unit 1, address 0, 10 registers: 01 04 00 00 00 0A 70 0D
+    frame = buildFrame(1, READ_INPUT_REGISTERS, 0, 10)
+    print(' '.join('{:02X}'.format(b) for b in frame))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Bounded queue pipeline stages. Each Stage is a worker thread with its own
+    bounded queue and a backpressure policy for when the queue is full:
+        BLOCK        - the producer waits for room
+        DROP_NEWEST  - the new item is discarded
+        DROP_OLDEST  - the oldest queued item is discarded to make room
+    Every stage counts processed, dropped and failed items and its deepest
+    queue, so a slow consumer shows up as drops instead of stalling the
+    producer.
+
+        stage = Stage("sinks", handler, 1024, DROP_NEWEST)
+        stage.start()
+        stage.put(item)
+        ...
+        stage.stop()      # drains the queue, then joins
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import threading
+import collections
+
+
+BLOCK = 'BLOCK'
+DROP_NEWEST = 'DROP_NEWEST'
+DROP_OLDEST = 'DROP_OLDEST'
+
+
+class Stage(threading.Thread) :
+    def __init__(self, name, handler, maxSize, policy=DROP_NEWEST) :
+        threading.Thread.__init__(self, name=name, daemon=True)
+        self.handler = handler
+        self.maxSize = maxSize
+        self.policy = policy
+        self.items = collections.deque()
+        self.cond = threading.Condition()
+        self.running = True
+
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.maxDepth = 0
+
+    #
+    # Queue an item, returns False if it was dropped
+    #
+    def put(self, item) :
+        with self.cond :
+            if len(self.items) >= self.maxSize :
+                if self.policy == BLOCK :
+                    while len(self.items) >= self.maxSize and self.running :
+                        self.cond.wait()
+                elif self.policy == DROP_NEWEST :
+                    self.dropped += 1
+                    return False
+                else :
+                    self.items.popleft()
+                    self.dropped += 1
+
+            self.items.append(item)
+            if len(self.items) > self.maxDepth :
+                self.maxDepth = len(self.items)
+            self.cond.notify_all()
+        return True
+
+    def run(self) :
+        while True :
+            with self.cond :
+                while not self.items and self.running :
+                    self.cond.wait()
+                if not self.items :
+                    break                       # Stopped and drained
+                item = self.items.popleft()
+                self.cond.notify_all()
+
+            try :
+                self.handler(item)
+            except Exception as e :
+                self.errors += 1
+                print("Exception in " + self.name + " stage: " + str(e))
+            self.processed += 1
+
+    #
+    # Stop after the queued items are handled
+    #
+    def stop(self) :
+        with self.cond :
+            self.running = False
+            self.cond.notify_all()
+        if self.is_alive() :
+            self.join()
+
+    def summary(self) :
+        return {"processed": self.processed, "dropped": self.dropped, "errors": self.errors,
+                "depth": len(self.items), "maxDepth": self.maxDepth}
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    import time
+
+    slow = Stage("slow", lambda item : time.sleep(0.01), 8, DROP_NEWEST)
+    slow.start()
+    t0 = time.perf_counter()
+    for n in range(100) :
+        slow.put(n)
+    print("100 puts in {:.3f} ms".format((time.perf_counter() - t0) * 1000.))
+    slow.stop()
+    print(slow.summary())
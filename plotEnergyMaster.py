@@ -9,6 +9,7 @@ DATE: 3/25/2021
 REVISION HISTORY
   DATE        AUTHOR          CHANGES
   yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   get_files_sw() returns rotated csv segments in time order
 
 
 OVERVIEW:
@@ -211,13 +212,13 @@ def consolidateData(tStamp, inData, ptsToSum, maxPts = 0) :
 
 
 def get_files_sw(path, sw) :
-    # sw is file name starts with
+    # sw is file name starts with, rotated segments sort before the live file
     result = []
     for f in os.scandir(path) :
-        if f.name.startswith(sw) :
+        if f.name.startswith(sw) and f.name.endswith(".csv") :
             result.append(f.name)
 
-    return result
+    return sorted(result)
     
 
 #
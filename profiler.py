@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Opt-in stage timing. Each (stage, key) pair keeps a rolling window of its
+    latest durations for p50/p95/p99 and the all time max. The key is None for
+    a whole stage, or names a channel or bus for a per channel breakdown.
+
+        t0 = profiler.start()
+        ...
+        profiler.stop("read", t0, chanPort)
+
+    While enabled is False, start() returns 0 and stop() returns at once, so
+    the hooks cost two calls per stage.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import time
+from array import array
+
+
+enabled = False
+WINDOW = 1024           # Latest durations kept per (stage, key)
+
+windows = {}            # (stage, key) : Window
+
+
+class Window :
+    __slots__ = ("samples", "next", "count", "maxSec")
+
+    def __init__(self) :
+        self.samples = array('d', bytes(8 * WINDOW))
+        self.next = 0
+        self.count = 0
+        self.maxSec = 0.
+
+    def add(self, seconds) :
+        self.samples[self.next] = seconds
+        self.next = (self.next + 1) % WINDOW
+        self.count += 1
+        if seconds > self.maxSec :
+            self.maxSec = seconds
+
+    #
+    # Nearest rank percentiles of the window in ms
+    #
+    def summary(self) :
+        s = sorted(self.samples[:min(self.count, WINDOW)])
+        def pct(p) :
+            return s[min(len(s) - 1, int(p / 100. * len(s)))] * 1000. if s else 0.
+        return {"count": self.count, "p50Ms": pct(50), "p95Ms": pct(95), "p99Ms": pct(99),
+                "maxMs": self.maxSec * 1000.}
+
+
+def start() :
+    return time.perf_counter() if enabled else 0.
+
+
+def stop(stage, t0, key=None) :
+    if enabled :
+        add(stage, time.perf_counter() - t0, key)
+
+
+def add(stage, seconds, key=None) :
+    window = windows.get((stage, key))
+    if window is None :
+        window = windows.setdefault((stage, key), Window())
+    window.add(seconds)
+
+
+#
+# Summary of every stage and key
+#     returns [{"stage", "key", "count", "p50Ms", "p95Ms", "p99Ms", "maxMs"}, ...]
+#
+def summary() :
+    result = []
+    for (stage, key), window in sorted(windows.items(), key=lambda item : (item[0][0], str(item[0][1]))) :
+        row = {"stage": stage, "key": "" if key is None else key}
+        row.update(window.summary())
+        result.append(row)
+    return result
+
+
+#
+# One line of whole stage p95 times
+#
+def statusLine() :
+    if not enabled :
+        return ""
+    return "Stage p95 ms: " + "  ".join(["{} {:.1f}".format(stage, window.summary()["p95Ms"]) \
+            for (stage, key), window in sorted(windows.items(), key=lambda item : item[0][0]) if key is None])
+
+
+def reset() :
+    windows.clear()
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    n = 100000
+
+    t0 = time.perf_counter()
+    for i in range(n) :
+        stop("off", start())
+    print("disabled: {:.3f} us per start/stop".format((time.perf_counter() - t0) * 1e6 / n))
+
+    enabled = True
+    t0 = time.perf_counter()
+    for i in range(n) :
+        stop("on", start(), i % 4)
+    print("enabled:  {:.3f} us per start/stop".format((time.perf_counter() - t0) * 1e6 / n))
+
+    for row in summary() :
+        print(row)
@@ -9,6 +9,12 @@ DATE: 3/01/2021
 REVISION HISTORY
   DATE        AUTHOR          CHANGES
   yyyy/mm/dd  --------------- ------------------------------------------------
+  2026/10/17  BrucesHobbies   Added pubRecordAsync() and pubRecordSoon() for the asyncio loop
+  2026/10/17  BrucesHobbies   CSV files rotate into time or size bounded segments with retention
+  2026/10/17  BrucesHobbies   CSV time stamps from clock(), replaced by replay.py's virtual clock
+                              Segment rotation also uses clock(), retention tracks the file
+                              on disk while a segment is being compressed
+                              energyMaster/logProfile rotated like the details logs
   2021/04/14  BrucesHobbies   Added support for Antonio's variable tone buzzer
 
 
@@ -60,6 +66,12 @@ import os
 import sys
 import time
 import datetime
+import glob
+import gzip
+import shutil
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 
 #
@@ -68,6 +80,14 @@ import datetime
 #
 CSV_FILE_ENABLED  = 1
 
+# CSV segments, topics starting with one of CSV_ROTATE_TOPICS are rotated. The
+# live file keeps its name, closed segments are renamed <file>.<start time>.csv
+CSV_ROTATE_TOPICS = ("energyMaster/logDetails_", "energyMaster/logProfile")
+CSV_ROTATE_HOURS  = 24                  # new segment at each boundary of this many hours, 0 disables
+CSV_ROTATE_BYTES  = 64 * 1024 * 1024    # new segment when the live file reaches this size, 0 disables
+CSV_KEEP_SEGMENTS = 2                   # closed segments kept per topic, oldest deleted, 0 keeps all
+CSV_COMPRESS      = 0                   # non zero gzips closed segments in the background
+
 EMAIL_SMS_ENABLED = 1
 
 IP_PORT_ENABLED   = 0    # Future
@@ -199,9 +219,47 @@ def pubRecord(dest, topic, data, hdr="") :
     return
 
 
+#
+# Publish from an asyncio event loop. Blocking sinks (CSV append, SMTP login,
+# InfluxDB write) run on a single long-lived worker thread, which also keeps
+# records for a topic in the order they were published.
+#
+sinkExecutor = None
+
+def pubRecordAsync(dest, topic, data, hdr="") :
+    global sinkExecutor
+
+    if sinkExecutor is None :
+        sinkExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pubScribe")
+    return asyncio.get_running_loop().run_in_executor(sinkExecutor, pubRecord, dest, topic, data, hdr)
+
+
+#
+# Fire and forget version of pubRecordAsync() for callers that do not await
+#
+def pubRecordSoon(dest, topic, data, hdr="") :
+    future = pubRecordAsync(dest, topic, data, hdr)
+    future.add_done_callback(sinkDone)
+    return future
+
+
+def sinkDone(future) :
+    if future.exception() is not None :
+        print("Exception publishing record: " + str(future.exception()))
+
+
+def shutdownWorker() :
+    global sinkExecutor
+
+    if sinkExecutor is not None :
+        sinkExecutor.shutdown()
+        sinkExecutor = None
+
+
 #
 # CSV files
 #
+clock = time.time      # time source of csv time stamps, replay.py sets a virtual clock
 topicFmtStr = {}       # format string for data records in a topic's csv file
 topicFiles = {}        # Dictionary of csv files that exist
 
@@ -238,6 +296,82 @@ def addTopicFileHeaders(filename, topic, data, hdr="") :
     return result
 
 
+#
+# CSV segment rotation. Each rotating topic tracks the size and start of its
+# live file, so the check per record is O(1). Rotation renames the live file
+# and deletes or compresses the oldest closed segment, it never rewrites data.
+# Segment lists hold the name of the file on disk, a segment becomes .csv.gz
+# only once its compression has finished. A segment retention drops while it
+# is still being compressed is deleted by compressSegment.
+#
+topicSegments = {}     # topic : [start time, bytes, [closed segment names, oldest first]]
+compressing = set()    # segment names being compressed
+segmentLock = threading.Lock()
+
+def segmentPeriod(t) :
+    return t // (CSV_ROTATE_HOURS * 3600) if CSV_ROTATE_HOURS else 0
+
+
+def rotateCsv(topic, filename) :
+    if not topic.startswith(CSV_ROTATE_TOPICS) :
+        return
+
+    t = clock()
+    if topic not in topicSegments :
+        # Existing segments are listed once per run
+        base = filename[:-len(".csv")]
+        closed = sorted([name for name in glob.glob(glob.escape(base) + ".*.csv*") if not name.endswith(".tmp")])
+        if os.path.isfile(filename) :
+            topicSegments[topic] = [os.path.getmtime(filename), os.path.getsize(filename), closed]
+        else :
+            topicSegments[topic] = [t, 0, closed]
+
+    seg = topicSegments[topic]
+    if seg[1] and ((CSV_ROTATE_BYTES and seg[1] >= CSV_ROTATE_BYTES) or \
+            segmentPeriod(t) != segmentPeriod(seg[0])) :
+        stamp = filename[:-len(".csv")] + "." + time.strftime('%Y%m%d-%H%M%S', time.localtime(seg[0]))
+        segName = stamp + ".csv"
+        n = 1
+        while os.path.exists(segName) or os.path.exists(segName + ".gz") :
+            segName = stamp + "-" + str(n) + ".csv"
+            n += 1
+        os.replace(filename, segName)
+        topicFiles.pop(topic, None)         # Header is written to the new live file
+
+        with segmentLock :
+            seg[2].append(segName)
+            if CSV_COMPRESS :
+                compressing.add(segName)
+                threading.Thread(target=compressSegment, args=(seg[2], segName), daemon=True).start()
+
+            while CSV_KEEP_SEGMENTS and len(seg[2]) > CSV_KEEP_SEGMENTS :
+                oldest = seg[2].pop(0)
+                if oldest in compressing :
+                    compressing.discard(oldest)
+                elif os.path.isfile(oldest) :
+                    os.remove(oldest)
+
+        seg[0], seg[1] = t, 0
+
+
+#
+# Gzip a closed segment, then swap it for the .gz in its topic's segment list.
+# If retention dropped the segment meanwhile, nothing is kept.
+#
+def compressSegment(closed, segName) :
+    with open(segName, 'rb') as src, gzip.open(segName + ".gz.tmp", 'wb') as dst :
+        shutil.copyfileobj(src, dst)
+
+    with segmentLock :
+        if segName in compressing :
+            compressing.discard(segName)
+            os.replace(segName + ".gz.tmp", segName + ".gz")
+            closed[closed.index(segName)] = segName + ".gz"
+        else :
+            os.remove(segName + ".gz.tmp")
+        os.remove(segName)
+
+
 #
 # Append data to CSV file
 #
@@ -245,9 +379,12 @@ def writeCsv(topic, data, hdr="") :
     filename = topic.replace('/','_') + ".csv"
     # print("Filename: ", filename)
 
+    rotateCsv(topic, filename)
+
     s = addTopicFileHeaders(filename, topic, data, hdr)
 
-    s += str(round(time.time())) + "," + datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S,')
+    t = clock()
+    s += str(round(t)) + "," + datetime.datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S,')
 
     if isinstance(data, dict) :
         s += ",".join("{}".format(v) for k, v in data.items())             # values
@@ -269,6 +406,9 @@ def writeCsv(topic, data, hdr="") :
         csvFile.write(s + '\n')
         csvFile.close()
 
+    if topic in topicSegments :
+        topicSegments[topic][1] += len(s) + 1
+
 
 
 #
@@ -8,6 +8,19 @@ Date: 3/22/2021
 REVISION HISTORY
   DATE        AUTHOR          CHANGES
   yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   Added persistent per-port connection pool shared by all reads/writes
+                              Added readAcBusPZEM() to read every address on a bus in one session
+                              Added asyncio readers readAcPZEMAsync() and readAcBusPZEMAsync()
+                              Added optional built-in RTU framer (modbusRtu.py), fixed 32-bit
+                              register scaling to use the high word << 16
+                              Added power only fast reads of registers 0x0003 - 0x0004
+                              Added per-device latency and error statistics, failed reads
+                              now return None instead of zeros
+                              Added scanBuses() to discover module addresses on several ports
+                              A port that fails to open is counted as an error, not as a
+                              0 ms read
+                              Latency statistics from answered reads only, pymodbus client
+                              given the same READ_TIMEOUT as the built-in one
   2022/11/06  BrucesHobbies   Added setAddrPowerMeter() and setAlarmThresholdPowerMeter()
   2022/03/26  BrucesHobbies   Added enchanced debug
                               Changed PZEM-017 model from "not verified" to "not supported"
@@ -40,11 +53,19 @@ GENERAL INFORMATION:
     PREREQUISITES
         sudo pip3 install pymodbus    # Install ModBus 
 
+    RTU_BUILTIN = 1 below uses the minimal framer in modbusRtu.py (pyserial only)
+    instead of pymodbus for register reads and writes. Compare the two with:
+        python3 pzem.py benchframer
+
     VERIFY PZEM MODULE PRESENCE USING RPi COMMAND LINE:
         (once attached by USB cable and RS-485 cable with module power on)
         ls /dev/ttyUSB*    # Show USB devices
         lsusb -v           # Show USB devices with details
 
+    FIND MODULE ADDRESSES ON ONE OR MORE PORTS:
+        python3 pzem.py scan /dev/ttyUSB0 /dev/ttyUSB1
+        (writes chanMap.json and prints chanNames/chanPorts/chanAddrs for energyMaster.py)
+
 PZEM MODULES
 
 AC MODULES (80-260V):
@@ -80,14 +101,28 @@ Communication protocol: 9600N82
 
 """
 
+import sys
+import time
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import pymodbus
 import serial
 import math
+import struct
+import bisect
+import json
 
-from pymodbus.pdu import ModbusRequest
+from pymodbus.pdu import ModbusRequest, ExceptionResponse
 from pymodbus.client.sync import ModbusSerialClient as ModbusClient
 from pymodbus.transaction import ModbusRtuFramer
 
+import modbusRtu
+
+
+RTU_BUILTIN = 0    # non zero uses modbusRtu.RtuClient instead of pymodbus ModbusSerialClient
+READ_TIMEOUT = 0.5 # seconds to wait for a module to answer, either client
+
 
 #
 # Bytes to float and apply scale factor
@@ -96,43 +131,285 @@ def scaleFactor(registers, sf) :
     if len(registers) == 1:
         return registers[0] / sf
     else :
-        return ((registers[1] << 8) + registers[0]) / sf
+        return ((registers[1] << 16) + registers[0]) / sf
+
+
+#
+# Per-device read statistics keyed by (chanPort, chanAddr)
+#     Every read is counted and, when it fails, which way it failed: timeouts
+#     (no or short response), crcErrors, or exceptions (Modbus exception
+#     responses, serial errors and ports that will not open). Only answered
+#     reads record their latency in the histogram, timed counts those, so a
+#     dead module's timeouts do not inflate the read time used for bus capacity.
+#
+LATENCY_BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)    # ms, upper edges, last bucket is above
+
+busStats = {}
+
+
+def newStats() :
+    return {"reads": 0, "timed": 0, "timeouts": 0, "crcErrors": 0, "exceptions": 0,
+            "latencySum": 0., "latencyMax": 0., "hist": [0] * (len(LATENCY_BUCKETS) + 1)}
+
+
+def recordRead(chanPort, chanAddr, latency, error=None) :
+    stats = busStats.get((chanPort, chanAddr))
+    if stats is None :
+        stats = busStats.setdefault((chanPort, chanAddr), newStats())
+
+    stats["reads"] += 1
+    if latency is not None and not error :
+        ms = latency * 1000.
+        stats["timed"] += 1
+        stats["latencySum"] += ms
+        if ms > stats["latencyMax"] :
+            stats["latencyMax"] = ms
+        stats["hist"][bisect.bisect_left(LATENCY_BUCKETS, ms)] += 1
+    if error :
+        stats[error] += 1
+
+
+#
+# Latency percentile in ms, resolved to the histogram bucket upper edge
+#
+def latencyPercentile(stats, pct) :
+    target = stats["timed"] * pct / 100.
+    count = 0
+    for idx, n in enumerate(stats["hist"]) :
+        count += n
+        if n and count >= target :
+            return min(LATENCY_BUCKETS[idx], stats["latencyMax"]) if idx < len(LATENCY_BUCKETS) else stats["latencyMax"]
+    return 0.
+
+
+#
+# Summary of one device's read statistics
+#
+def getBusStats(chanPort, chanAddr) :
+    stats = busStats.get((chanPort, chanAddr), newStats())
+    reads = stats["reads"]
+    errors = stats["timeouts"] + stats["crcErrors"] + stats["exceptions"]
+    timed = stats["timed"]
+    return {"reads": reads, "timed": timed, "errors": errors, "errorRate": errors / reads if reads else 0.,
+            "timeouts": stats["timeouts"], "crcErrors": stats["crcErrors"], "exceptions": stats["exceptions"],
+            "meanMs": stats["latencySum"] / timed if timed else 0.,
+            "p50Ms": latencyPercentile(stats, 50), "p95Ms": latencyPercentile(stats, 95),
+            "maxMs": stats["latencyMax"]}
+
+
+def resetBusStats() :
+    busStats.clear()
+
+
+#
+# Classify a pymodbus error result for the statistics
+#
+def pymodbusError(result) :
+    if isinstance(result, ExceptionResponse) :
+        return "exceptions"
+    if "CRC" in str(result).upper() :
+        return "crcErrors"
+    return "timeouts"
+
+
+#
+# Connection pool
+#     Serial handles are kept open across reads instead of connect/read/close on
+#     every sample. Clients are keyed by (chanPort, baudrate, stopbits), so AC
+#     (9600N81) and DC (9600N82) modules each get their own handle. A client that
+#     raises an exception is closed and dropped so the next call reconnects.
+#
+clientPool = {}                    # (chanPort, baudrate, stopbits) : ModbusClient or modbusRtu.RtuClient
+clientPoolLock = threading.Lock()
+
+
+def getClient(chanPort, stopbits=1, baudrate=9600) :
+    key = (chanPort, baudrate, stopbits)
+
+    with clientPoolLock :
+        client = clientPool.get(key)
+        if client is None :
+            if RTU_BUILTIN :
+                client = modbusRtu.RtuClient(chanPort, baudrate = baudrate, stopbits = stopbits, timeout = READ_TIMEOUT)
+            else :
+                client = ModbusClient(method = "rtu", port=chanPort, stopbits = stopbits, bytesize = 8, parity = 'N', baudrate = baudrate, \
+                        timeout = READ_TIMEOUT)
+            clientPool[key] = client
+
+    if not client.is_socket_open() :
+        if not client.connect() :
+            return None
+
+    return client
+
+
+def dropClient(chanPort, stopbits=1, baudrate=9600) :
+    with clientPoolLock :
+        client = clientPool.pop((chanPort, baudrate, stopbits), None)
+
+    if client is not None :
+        client.close()
+
+
+def closeAllClients() :
+    with clientPoolLock :
+        clients = list(clientPool.values())
+        clientPool.clear()
+        executors = list(portExecutors.values())
+        portExecutors.clear()
+
+    for executor in executors :
+        executor.shutdown()
+
+    for client in clients :
+        client.close()
+
+
+#
+# Decode AC module input registers 0x0000 - 0x0009
+#
+def decodeAcRegisters(registers) :
+    voltage = scaleFactor (registers[0:1], 10)
+    amperage = scaleFactor (registers[1:3], 1000)
+    power = scaleFactor (registers[3:5], 10)
+    energy = scaleFactor (registers[5:7], 1)
+    frequency = scaleFactor (registers[7:8], 10)
+    powerFactor = scaleFactor (registers[8:9], 100)
+    alarmStatus = int(registers[9])
+
+    return voltage, amperage, power, energy, frequency, powerFactor, alarmStatus
+
+
+#
+# Decode a built-in framer response to function 0x04 for registers 0x0000 - 0x0009.
+# All registers are unpacked at once; 32-bit values are low word first.
+#
+AC_REGS = struct.Struct('>10H')
+
+def decodeAcFrame(frame) :
+    v, aLo, aHi, pLo, pHi, eLo, eHi, f, pf, alarm = AC_REGS.unpack_from(frame, 3)
+    return v / 10, ((aHi << 16) | aLo) / 1000, ((pHi << 16) | pLo) / 10, ((eHi << 16) | eLo), \
+            f / 10, pf / 100, alarm
+
+
+DC_REGS = struct.Struct('>8H')
+
+def decodeDcFrame(frame) :
+    v, a, pLo, pHi, eLo, eHi, highAlarm, lowAlarm = DC_REGS.unpack_from(frame, 3)
+    return v / 100, a / 100, ((pHi << 16) | pLo) / 10, ((eHi << 16) | eLo), highAlarm, lowAlarm
+
+
+AC_POWER_REGS = struct.Struct('>2H')
+
+def decodeAcPowerFrame(frame) :
+    pLo, pHi = AC_POWER_REGS.unpack_from(frame, 3)
+    return (None, None, ((pHi << 16) | pLo) / 10, None, None, None, None)
+
 
 
 #
 # AC Module read
 #     chanPort is the USB port - example: "/dev/ttyUSB0"
 #     chanAddr is the PZEM module ModBus device address - example: 0x01
+#     Returns None if the module does not answer
 #
 def readAcPZEM(chanPort, chanAddr) :
-    voltage = 0
-    amperage = 0
-    power = 0
-    energy = 0
-    frequency = 0
-    powerFactor = 0
-    alarmStatus = 0
-
-    client = ModbusClient(method = "rtu", port=chanPort, stopbits = 1, bytesize = 8, parity = 'N', baudrate = 9600)
-    
-    if client.connect() :
+    return readAcBusPZEM(chanPort, [chanAddr])[0]
+
+
+#
+# AC Module multi-drop bus read
+#     Reads every address in chanAddrs back to back over one open connection.
+#     Frames are separated only by the 3.5 character silent interval required
+#     by Modbus RTU. Returns one reading tuple per address, in chanAddrs order.
+#     An address that fails to answer returns None (missing) without closing
+#     the bus. Every read is recorded in busStats.
+#
+#     powerOnly is an optional list of flags, one per address. A flagged address
+#     gets a fast read of just the power registers (0x0003 - 0x0004), 17 bytes on
+#     the wire instead of 33, and its tuple has None for every other value.
+#
+def readAcBusPZEM(chanPort, chanAddrs, powerOnly=None) :
+    readings = [None] * len(chanAddrs)
+
+    client = getClient(chanPort, stopbits = 1)
+
+    for idx, chanAddr in enumerate(chanAddrs) :
+        if not client :
+            recordRead(chanPort, chanAddr, None, "exceptions")
+            continue
+
+        fast = powerOnly is not None and powerOnly[idx]
+        error = None
+        t0 = time.perf_counter()
+
         try :
-            result = client.read_input_registers (0x0000, 10, unit = chanAddr)
-            voltage = scaleFactor (result.registers[0:1], 10)
-            amperage = scaleFactor (result.registers[1:3], 1000)
-            power = scaleFactor (result.registers[3:5], 10)
-            energy = scaleFactor (result.registers[5:7], 1)
-            frequency = scaleFactor (result.registers[7:8], 10)
-            powerFactor = scaleFactor (result.registers[8:9], 100)
-            alarmStatus = int(result.registers[9])
+            if RTU_BUILTIN :
+                if fast :
+                    readings[idx] = decodeAcPowerFrame(client.readInputRegisters(chanAddr, 0x0003, 2))
+                else :
+                    readings[idx] = decodeAcFrame(client.readInputRegisters(chanAddr, 0x0000, 10))
+
+            else :
+                if fast :
+                    result = client.read_input_registers (0x0003, 2, unit = chanAddr)
+                else :
+                    result = client.read_input_registers (0x0000, 10, unit = chanAddr)
+
+                if result.isError() :
+                    # No or bad response from this address, the bus itself is fine
+                    error = pymodbusError(result)
+                elif fast :
+                    readings[idx] = (None, None, scaleFactor (result.registers[0:2], 10), None, None, None, None)
+                else :
+                    readings[idx] = decodeAcRegisters(result.registers)
+
+        # No, corrupt or exception response from this address, the bus itself is fine
+        except modbusRtu.CrcError :
+            error = "crcErrors"
+
+        except modbusRtu.ExceptionResponse :
+            error = "exceptions"
+
+        except modbusRtu.NoResponseError :
+            error = "timeouts"
 
         except Exception as e :
             print('Exception reading AC PZEM: ' + str(e))
+            error = "exceptions"
+            dropClient(chanPort, stopbits = 1)
+            client = getClient(chanPort, stopbits = 1)
 
-        finally :
-            client.close()
+        recordRead(chanPort, chanAddr, time.perf_counter() - t0, error)
+
+    return readings
+
+
+#
+# asyncio readers
+#     The serial transaction runs on a long-lived worker thread owned by the
+#     port, so one event loop can multiplex all buses without blocking and
+#     without creating threads per read. readAcPZEM() and readAcBusPZEM() remain
+#     the synchronous API.
+#
+portExecutors = {}                 # chanPort : single worker ThreadPoolExecutor
+
+def getPortExecutor(chanPort) :
+    with clientPoolLock :
+        executor = portExecutors.get(chanPort)
+        if executor is None :
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pzem")
+            portExecutors[chanPort] = executor
+    return executor
 
-    return voltage, amperage, power, energy, frequency, powerFactor, alarmStatus
+
+async def readAcBusPZEMAsync(chanPort, chanAddrs, powerOnly=None) :
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(getPortExecutor(chanPort), readAcBusPZEM, chanPort, chanAddrs, powerOnly)
+
+
+async def readAcPZEMAsync(chanPort, chanAddr) :
+    return (await readAcBusPZEMAsync(chanPort, [chanAddr]))[0]
 
 
 #
@@ -140,49 +417,70 @@ def readAcPZEM(chanPort, chanAddr) :
 #     chanPort is the USB port - example: "/dev/ttyUSB0"
 #     chanAddr is the PZEM module ModBus device address - example: 0x01
 #
+#     Returns None if the module does not answer
+#
 def readDcPZEM(chanPort, chanAddr) :
-    voltage = 0
-    amperage = 0
-    power = 0
-    energy = 0
-    highVoltAlarmStatus = 0
-    lowVoltAlarmStatus = 0
-
-    #Connect to the serial modbus server, note PZEM-017 is 2 stop bits
-    client = ModbusClient(method = "rtu", port=chanPort, stopbits = 2, bytesize = 8, parity = 'N', baudrate = 9600)
-    
-    if client.connect ():
-        try :
+    reading = None
+
+    # Note PZEM-017 is 2 stop bits
+    client = getClient(chanPort, stopbits = 2)
+    if not client :
+        recordRead(chanPort, chanAddr, None, "exceptions")
+        return reading
+
+    error = None
+    t0 = time.perf_counter()
+
+    try :
+        if RTU_BUILTIN :
+            reading = decodeDcFrame(client.readInputRegisters(chanAddr, 0x0000, 8))
+
+        else :
             result = client.read_input_registers (0x0000, 8, unit = chanAddr)
-            voltage = scaleFactor(result.registers[0:1], 100)
-            amperage = scaleFactor(result.registers[1:2], 100)
-            power = scaleFactor(result.registers[2:4], 10)
-            energy = scaleFactor(result.registers[4:6], 1)
-            highVoltAlarmStatus = int(result.registers[6])
-            lowVoltAlarmStatus = int(result.registers[7])
+            if result.isError() :
+                error = pymodbusError(result)
+            else :
+                voltage = scaleFactor(result.registers[0:1], 100)
+                amperage = scaleFactor(result.registers[1:2], 100)
+                power = scaleFactor(result.registers[2:4], 10)
+                energy = scaleFactor(result.registers[4:6], 1)
+                highVoltAlarmStatus = int(result.registers[6])
+                lowVoltAlarmStatus = int(result.registers[7])
+                reading = (voltage, amperage, power, energy, highVoltAlarmStatus, lowVoltAlarmStatus)
 
-        except Exception as e :
-            print('Exception reading DC PZEM: ' + str(e))
+    except modbusRtu.CrcError :
+        error = "crcErrors"
 
-        finally :
-            client.close()
+    except modbusRtu.ExceptionResponse :
+        error = "exceptions"
 
-    return voltage, amperage, power, energy, highVoltAlarmStatus, lowVoltAlarmStatus
+    except modbusRtu.NoResponseError :
+        error = "timeouts"
+
+    except Exception as e :
+        print('Exception reading DC PZEM: ' + str(e))
+        error = "exceptions"
+        dropClient(chanPort, stopbits = 2)
+
+    recordRead(chanPort, chanAddr, time.perf_counter() - t0, error)
+
+    return reading
 
 
 def setAddrPowerMeter(chanPort, chanAddr, newChanAddr) :
     print("PZEM-016 module on ", chanPort, " with address of ", chanAddr, " changing to: ", newChanAddr)
-    client = ModbusClient(method = "rtu", port=chanPort, stopbits = 1, bytesize = 8, parity = 'N', baudrate = 9600)
+    client = getClient(chanPort, stopbits = 1)
     
-    if client.connect() :
+    if client :
         try :
-            result = client.write_register (0x0002, newChanAddr, unit = chanAddr)
+            if RTU_BUILTIN :
+                client.writeRegister(chanAddr, 0x0002, newChanAddr)
+            else :
+                result = client.write_register (0x0002, newChanAddr, unit = chanAddr)
 
         except Exception as e :
             print('Exception writing AC PZEM: ' + str(e))
-
-        finally :
-            client.close()
+            dropClient(chanPort, stopbits = 1)
     return
 
   
@@ -192,20 +490,84 @@ def setAlarmThresholdPowerMeter(chanPort, chanAddr, alarmThreshold) :
         return
 
     print("PZEM-016 module on ", chanPort, " with address of ", chanAddr, " changing alarm threshold to: ", alarmThreshold)
-    client = ModbusClient(method = "rtu", port=chanPort, stopbits = 1, bytesize = 8, parity = 'N', baudrate = 9600)
+    client = getClient(chanPort, stopbits = 1)
     
-    if client.connect() :
+    if client :
         try :
-            result = client.write_register (0x0001, alarmThreshold, unit = chanAddr)
+            if RTU_BUILTIN :
+                client.writeRegister(chanAddr, 0x0001, alarmThreshold)
+            else :
+                result = client.write_register (0x0001, alarmThreshold, unit = chanAddr)
 
         except Exception as e :
             print('Exception writing AC PZEM: ' + str(e))
-
-        finally :
-            client.close()   
+            dropClient(chanPort, stopbits = 1)
     return
 
 
+#
+# Bus scanner
+#     Probes each address with a one register read and a short timeout using the
+#     built-in framer on its own connection. RS-485 is half duplex, so requests
+#     on one bus go out back to back rather than overlapped; the time per empty
+#     address is the timeout. Addresses that answered with a bad frame are
+#     probed again. Returns the list of addresses that answered.
+#
+def scanBus(chanPort, addrs=range(1, 248), timeout=0.05, stopbits=1) :
+    found = []
+    retry = []
+
+    client = modbusRtu.RtuClient(chanPort, stopbits = stopbits, timeout = timeout)
+    if not client.connect() :
+        return found
+
+    try :
+        for addr in addrs :
+            try :
+                client.readInputRegisters(addr, 0x0000, 1)
+                found.append(addr)
+            except modbusRtu.NoResponseError :
+                pass
+            except modbusRtu.ModbusRtuError :
+                retry.append(addr)                 # Something answered, try once more
+
+        for addr in retry :
+            try :
+                client.readInputRegisters(addr, 0x0000, 1)
+                found.append(addr)
+            except modbusRtu.ExceptionResponse :
+                found.append(addr)                 # A module that rejects the request is still present
+            except modbusRtu.ModbusRtuError :
+                print("Address " + str(addr) + " on " + chanPort + " answered with errors")
+
+    finally :
+        client.close()
+
+    return sorted(found)
+
+
+#
+# Scan all ports at the same time and build a channel map for energyMaster.py
+#     returns {"chanNames": [...], "chanPorts": [...], "chanAddrs": [...]}
+#
+def scanBuses(chanPorts, addrs=range(1, 248), timeout=0.05, mapFileName="chanMap.json") :
+    with ThreadPoolExecutor(max_workers=len(chanPorts), thread_name_prefix="scan") as executor :
+        results = list(executor.map(lambda port : scanBus(port, addrs, timeout), chanPorts))
+
+    chanMap = {"chanNames": [], "chanPorts": [], "chanAddrs": []}
+    for chanPort, found in zip(chanPorts, results) :
+        for addr in found :
+            chanMap["chanNames"].append("Chan" + str(len(chanMap["chanNames"]) + 1))
+            chanMap["chanPorts"].append(chanPort)
+            chanMap["chanAddrs"].append(addr)
+
+    if mapFileName :
+        with open(mapFileName, 'w') as mapFile :
+            json.dump(chanMap, mapFile, indent=4)
+
+    return chanMap
+
+
 def resetEnergyPowerMeter(chanPort, chanAddr) :
     print("Not implemented.")
     return
@@ -216,7 +578,13 @@ def calibrationPowerMeter(chanPort, chanAddr) :
 
 def read_pzem(chanPort, chanAddr) :
     print("Test PZEM-016 module on ", chanPort, " with channel address of ", chanAddr, " by performing read of 10 registers:")
-    voltage, amperage, power, energy, frequency, powerFactor, alarmStatus = readAcPZEM(chanPort, chanAddr)
+    reading = readAcPZEM(chanPort, chanAddr)
+    if reading is None :
+        print("No response.")
+        print(getBusStats(chanPort, chanAddr))
+        return
+
+    voltage, amperage, power, energy, frequency, powerFactor, alarmStatus = reading
     print(str(voltage) + 'V')
     print(str(amperage) + 'A')
     print(str(power) + 'W')
@@ -226,6 +594,71 @@ def read_pzem(chanPort, chanAddr) :
     print(str(alarmStatus) + " alarm status")
 
 
+#
+# Timing comparison of connect/read/close per sample versus the connection pool
+#     python3 pzem.py bench [port] [addr] [n]
+#
+def benchPool(chanPort, chanAddr, n=50) :
+    t0 = time.perf_counter()
+    for i in range(n) :
+        readAcPZEM(chanPort, chanAddr)
+        dropClient(chanPort)                 # Previous behavior, open and close every read
+    tOpenClose = (time.perf_counter() - t0) / n
+
+    readAcPZEM(chanPort, chanAddr)           # Open pooled handle before timing
+    t0 = time.perf_counter()
+    for i in range(n) :
+        readAcPZEM(chanPort, chanAddr)
+    tPooled = (time.perf_counter() - t0) / n
+
+    print("Open/read/close: {:.2f} ms per read".format(tOpenClose*1000.))
+    print("Pooled         : {:.2f} ms per read".format(tPooled*1000.))
+
+    return tOpenClose, tPooled
+
+
+#
+# Micro-benchmark of per-read CPU for pymodbus versus the built-in framer.
+# No hardware needed: both paths build the request frame and decode the same
+# canned 10 register response.
+#     python3 pzem.py benchframer [n]
+#
+def benchFramer(n=20000) :
+    from pymodbus.factory import ClientDecoder
+    from pymodbus.register_read_message import ReadInputRegistersRequest
+
+    body = bytes([0x01, 0x04, 20]) + struct.pack('>10H', 2301, 1500, 0, 1234, 0, 567, 0, 600, 95, 0)
+    response = body + struct.pack('<H', modbusRtu.crc16(body))
+
+    framer = ModbusRtuFramer(ClientDecoder())
+    results = []
+
+    t0 = time.perf_counter()
+    for i in range(n) :
+        framer.buildPacket(ReadInputRegistersRequest(0x0000, 10, unit = 1))
+        framer.processIncomingPacket(response, results.append, unit = 1)
+        decodeAcRegisters(results.pop().registers)
+    tPymodbus = (time.perf_counter() - t0) / n
+
+    requests = {}
+    key = (1, modbusRtu.READ_INPUT_REGISTERS, 0x0000, 10)
+    t0 = time.perf_counter()
+    for i in range(n) :
+        frame = requests.get(key)
+        if frame is None :
+            frame = requests[key] = modbusRtu.buildFrame(*key)
+        mv = memoryview(response)
+        if modbusRtu.crc16(mv[:-2]) != (mv[-2] | (mv[-1] << 8)) :
+            raise modbusRtu.CrcError()
+        decodeAcFrame(mv)
+    tBuiltin = (time.perf_counter() - t0) / n
+
+    print("pymodbus : {:.1f} us per read".format(tPymodbus*1e6))
+    print("built-in : {:.1f} us per read".format(tBuiltin*1e6))
+
+    return tPymodbus, tBuiltin
+
+
 if __name__ == '__main__':
     #import logging
     #logging.basicConfig()
@@ -236,6 +669,32 @@ if __name__ == '__main__':
     chanAddrs = [0x01, 0x01]
     chan = 0
     changeAddressFlag = False
+
+    # python3 pzem.py scan /dev/ttyUSB0 /dev/ttyUSB1
+    if len(sys.argv) > 1 and sys.argv[1] == "scan" :
+        ports = sys.argv[2:] if len(sys.argv) > 2 else chanPorts
+        t0 = time.perf_counter()
+        chanMap = scanBuses(ports)
+        print("Scanned {} port(s) in {:.1f} s, found {} module(s). Wrote chanMap.json\n".format( \
+                len(ports), time.perf_counter() - t0, len(chanMap["chanAddrs"])))
+        print("chanNames = " + json.dumps(chanMap["chanNames"]))
+        print("chanPorts = " + json.dumps(chanMap["chanPorts"]))
+        print("chanAddrs = " + json.dumps(chanMap["chanAddrs"]))
+        sys.exit()
+
+    # python3 pzem.py benchframer 20000
+    if len(sys.argv) > 1 and sys.argv[1] == "benchframer" :
+        benchFramer(int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
+        sys.exit()
+
+    # python3 pzem.py bench /dev/ttyUSB0 1 50
+    if len(sys.argv) > 1 and sys.argv[1] == "bench" :
+        port = sys.argv[2] if len(sys.argv) > 2 else chanPorts[chan]
+        addr = int(sys.argv[3]) if len(sys.argv) > 3 else chanAddrs[chan]
+        n = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+        benchPool(port, addr, n)
+        closeAllClients()
+        sys.exit()
     
     # if two arguements are provided on the command line change the single device address, for example to change from 1 to 5
     # python3 pzem.py 1 5
@@ -257,3 +716,4 @@ if __name__ == '__main__':
         setAddrPowerMeter(chanPorts[chan], chanAddrs[0], chanAddrs[1])
         read_pzem(chanPorts[chan], chanAddrs[1])
 
+    closeAllClients()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Simulates one or more PZEM-016 (AC) or PZEM-017 (DC) modules on a pseudo-
+    terminal so pzem.py and energyMaster.py can be exercised and benchmarked
+    without hardware. Each simulated bus opens a pty pair and answers Modbus
+    RTU function 0x04 (read input registers) and 0x06 (write single register)
+    for every configured address, like several modules on one RS-485 pair.
+
+    Load profiles:
+        motor   - synthetic on/off motor cycle with startup surge and noise
+        csv     - replay of a CSV file with columns: time (s), watts
+                  and optionally volts and power factor. The file loops.
+
+    Fault injection:
+        latency - response delay in seconds
+        baud    - when set, also delay by the wire time of request and response
+        drop    - probability a request gets no response
+        crcerr  - probability a response has a corrupt CRC
+
+USAGE:
+    python3 pzemSim.py                              # one motor at address 1
+    python3 pzemSim.py --addrs 1,2,3 --drop 0.01    # three modules, 1% dropped frames
+    python3 pzemSim.py --profile csv --csv load.csv
+    python3 pzemSim.py --bench 8                    # polling throughput, 1 to 8 modules
+
+    The pty path is printed at start. Put it in energyMaster.chanPorts.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import sys
+import tty
+import csv
+import time
+import random
+import struct
+import argparse
+import threading
+
+import modbusRtu
+
+
+#
+# Load profiles, each returns a function of elapsed seconds -> (volts, watts, pf, hz)
+#
+def motorProfile(onWatts=500., onTime=20., offTime=40., startupWatts=1500., startupTime=1., noise=0.02, volts=120.) :
+    period = onTime + offTime
+
+    def profile(t) :
+        phase = t % period
+        if phase >= onTime :
+            return volts, 0., 0., 60.
+        watts = startupWatts if phase < startupTime else onWatts
+        watts *= 1. + noise * random.gauss(0., 1.)
+        return volts, max(watts, 0.), 0.85, 60.
+
+    return profile
+
+
+def csvProfile(filename, volts=120.) :
+    tStamp = []
+    rows = []
+    with open(filename, 'r') as csvFile :
+        for row in csv.reader(csvFile) :
+            try :
+                t = float(row[0])
+            except ValueError :
+                continue                     # header row
+            watts = float(row[1])
+            v = float(row[2]) if len(row) > 2 else volts
+            pf = float(row[3]) if len(row) > 3 else (0.85 if watts > 0 else 0.)
+            tStamp.append(t)
+            rows.append((v, watts, pf, 60.))
+
+    t0 = tStamp[0]
+    tStamp = [t - t0 for t in tStamp]
+    duration = tStamp[-1] + (tStamp[1] if len(tStamp) > 1 else 1.)
+
+    def profile(t) :
+        t = t % duration
+        # Last row at or before t
+        lo, hi = 0, len(tStamp)
+        while hi - lo > 1 :
+            mid = (lo + hi) // 2
+            if tStamp[mid] <= t :
+                lo = mid
+            else :
+                hi = mid
+        return rows[lo]
+
+    return profile
+
+
+#
+# One simulated module
+#
+class SimPzem :
+    def __init__(self, addr, profile, dc=False) :
+        self.addr = addr
+        self.profile = profile
+        self.dc = dc
+        self.alarmThreshold = 23000
+        self.energy = 0.                      # Wh
+        self.t0 = time.monotonic()
+        self.tLast = self.t0
+
+    def registers(self) :
+        t = time.monotonic()
+        volts, watts, pf, hz = self.profile(t - self.t0)
+        self.energy += watts * (t - self.tLast) / 3600.
+        self.tLast = t
+
+        amps = watts / (volts * pf) if pf else 0.
+        p = int(round(watts * 10))
+        e = int(self.energy)
+
+        if self.dc :
+            return [int(round(volts * 100)) & 0xFFFF, int(round(amps * 100)) & 0xFFFF, p & 0xFFFF, p >> 16, \
+                    e & 0xFFFF, e >> 16, 0, 0]
+
+        a = int(round(amps * 1000))
+        return [int(round(volts * 10)) & 0xFFFF, a & 0xFFFF, a >> 16, p & 0xFFFF, p >> 16, \
+                e & 0xFFFF, e >> 16, int(round(hz * 10)), int(round(pf * 100)), \
+                1 if watts > self.alarmThreshold else 0]
+
+
+#
+# One simulated RS-485 bus on a pty
+#
+class SimBus :
+    def __init__(self, devices, latency=0., drop=0., crcerr=0., baud=0) :
+        self.devices = {dev.addr : dev for dev in devices}
+        self.latency = latency
+        self.baud = baud
+        self.drop = drop
+        self.crcerr = crcerr
+        self.requests = 0
+        self.dropped = 0
+        self.corrupted = 0
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) :
+        self.thread.start()
+        return self.port
+
+    def stop(self) :
+        self.running = False
+        os.close(self.slave)
+        os.close(self.master)
+
+    def run(self) :
+        buf = b''
+        while self.running :
+            try :
+                buf += os.read(self.master, 256)
+            except OSError :
+                break
+
+            # Requests for 0x04 and 0x06 are always 8 bytes
+            while len(buf) >= 8 :
+                frame, buf = buf[:8], buf[8:]
+                if modbusRtu.crc16(frame[:6]) != struct.unpack('<H', frame[6:])[0] :
+                    buf = b''                 # Resync on next request
+                    break
+                self.respond(frame)
+
+    def respond(self, frame) :
+        unit, function, address, value = struct.unpack('>BBHH', frame[:6])
+        dev = self.devices.get(unit)
+        if dev is None :
+            return                            # Not on this bus, real modules stay silent
+
+        self.requests += 1
+        if random.random() < self.drop :
+            self.dropped += 1
+            return
+
+        if function == modbusRtu.READ_INPUT_REGISTERS :
+            regs = dev.registers()[address:address+value]
+            if len(regs) != value :
+                body = bytes([unit, function | 0x80, 0x02])          # Illegal data address
+            else :
+                body = bytes([unit, function, 2*value]) + struct.pack('>%dH' % value, *regs)
+
+        elif function == modbusRtu.WRITE_SINGLE_REGISTER :
+            if address == 0x0001 :
+                dev.alarmThreshold = value
+            elif address == 0x0002 :
+                del self.devices[unit]
+                dev.addr = value
+                self.devices[value] = dev
+            body = frame[:6]
+
+        else :
+            body = bytes([unit, function | 0x80, 0x01])              # Illegal function
+
+        crc = modbusRtu.crc16(body)
+        if random.random() < self.crcerr :
+            self.corrupted += 1
+            crc ^= 0xFFFF
+
+        delay = self.latency
+        if self.baud :
+            delay += (len(frame) + len(body) + 2) * 10. / self.baud
+        if delay :
+            time.sleep(delay)
+        os.write(self.master, body + struct.pack('<H', crc))
+
+
+#
+# Benchmark bus polling throughput for 1..nMax modules on one simulated bus
+#
+def benchPolling(nMax=8, nReads=20, latency=0., drop=0., crcerr=0., baud=0) :
+    import pzem
+
+    print("Modules  ms/tick  reads/s")
+    for n in range(1, nMax + 1) :
+        addrs = list(range(1, n + 1))
+        bus = SimBus([SimPzem(addr, motorProfile()) for addr in addrs], latency, drop, crcerr, baud)
+        port = bus.start()
+
+        pzem.readAcBusPZEM(port, addrs)
+        t0 = time.perf_counter()
+        for i in range(nReads) :
+            pzem.readAcBusPZEM(port, addrs)
+        tTick = (time.perf_counter() - t0) / nReads
+
+        print("{:7d} {:8.1f} {:8.0f}".format(n, tTick * 1000., n / tTick))
+        pzem.closeAllClients()
+        bus.stop()
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Simulated PZEM modules on a pty")
+    parser.add_argument("--addrs", default="1", help="comma separated module addresses")
+    parser.add_argument("--dc", action="store_true", help="simulate PZEM-017 DC modules")
+    parser.add_argument("--profile", default="motor", choices=["motor", "csv"])
+    parser.add_argument("--csv", help="csv file for --profile csv")
+    parser.add_argument("--latency", type=float, default=0., help="response delay (s)")
+    parser.add_argument("--drop", type=float, default=0., help="dropped frame probability")
+    parser.add_argument("--crcerr", type=float, default=0., help="CRC error probability")
+    parser.add_argument("--baud", type=int, default=0, help="emulate wire time at this baud rate")
+    parser.add_argument("--bench", type=int, default=0, help="benchmark polling for 1..N modules")
+    args = parser.parse_args()
+
+    if args.bench :
+        benchPolling(args.bench, latency=args.latency, drop=args.drop, crcerr=args.crcerr, baud=args.baud)
+        sys.exit()
+
+    devices = []
+    for addr in args.addrs.split(",") :
+        profile = csvProfile(args.csv) if args.profile == "csv" else motorProfile()
+        devices.append(SimPzem(int(addr), profile, args.dc))
+
+    bus = SimBus(devices, args.latency, args.drop, args.crcerr, args.baud)
+    print("Simulated PZEM bus on " + bus.start() + " addresses " + args.addrs)
+    print("\nPress CTRL+C to exit...\n")
+
+    try :
+        while True :
+            time.sleep(10)
+            print("Requests: {}  dropped: {}  CRC errors: {}".format(bus.requests, bus.dropped, bus.corrupted))
+
+    except KeyboardInterrupt :
+        bus.stop()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+  2026/10/17  BrucesHobbies   Outputs of an earlier run cleared, per channel settings and
+                              alg overrides looked up by channel name
+
+
+OVERVIEW:
+    Replay logged readings through energyMaster's accounting and alg code in
+    virtual time, as fast as the CPU allows. Inputs are logDetails csv files,
+    energyMaster_logDetails_<chan>.csv, and capture files from captureBuffer.
+
+    Every reading goes through storeReadings(), updatePower() and
+    periodicTasks() with its logged time, so cycles, stats logs, interval
+    logs and alerts come out as they would live. Alerts and status messages
+    are written to csv instead of being sent. Output goes to its own
+    directory, including a fresh cfgAlg.json calibration, so a threshold
+    change can be backtested without touching the live files. Outputs of an
+    earlier run in that directory are deleted first, so every run starts
+    uncalibrated and gives the same result.
+
+    Thresholds, run time limits and the alg.py overrides are looked up by
+    channel name in energyMaster's configuration, so a channel replayed on
+    its own is set up as it is live.
+
+        python3 replay.py energyMaster_logDetails_Sump.csv --out replay
+
+    logDetails files have whole second time stamps and only on readings.
+    Readings within a second are spread evenly across it, and a gap longer
+    than --gap seconds is taken as the motor turning off after its last
+    reading.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import os
+import math
+import time
+import datetime
+import heapq
+import itertools
+
+import energyMaster as em
+import alg
+import pubScribe
+import chanState
+import captureBuffer
+
+
+REPLAY_PORT = "replay"
+virtualTime = 0.
+
+
+def virtualClock() :
+    return virtualTime
+
+
+#
+# Readings of a logDetails csv file
+#     yields (t, chan, reading) with reading in storeReadings() order
+#
+def detailsStream(fileName, chan, gapOff, tInterval) :
+    with open(fileName, 'r') as f :
+        f.readline()                                        # Header
+        rows = (line.rstrip().split(",") for line in f if line.strip())
+        last = None
+        for sec, group in itertools.groupby(rows, key=lambda fields : fields[0]) :
+            group = list(group)
+            sec = float(sec)
+            if last is not None and sec - 0.5 - last[0] > gapOff :
+                yield last[0] + tInterval, chan, offReading(last[1])
+            for n, fields in enumerate(group) :
+                # Rows carry a chan column ahead of the values, older files may not
+                values = fields[3:10] if len(fields) >= 10 else fields[2:9]
+                last = (sec - 0.5 + (n + 0.5) / len(group), tuple([float(v) for v in values]))
+                yield last[0], chan, last[1]
+        if last is not None :
+            yield last[0] + tInterval, chan, offReading(last[1])
+
+
+def offReading(reading) :
+    voltage, amperage, power, energy, frequency, powerFactor, alarmStatus = reading
+    return (voltage, 0., 0., energy, frequency, powerFactor, alarmStatus)
+
+
+#
+# Readings of a capture file
+#
+def captureStream(cols, chan) :
+    for t, voltage, amperage, power, powerFactor, frequency in zip(cols["time"], cols["voltage"], \
+            cols["amperage"], cols["power"], cols["powerFactor"], cols["frequency"]) :
+        if math.isnan(voltage) :
+            # Power only poll
+            yield t, chan, (None, None, power, None, None, None, None)
+        else :
+            yield t, chan, (voltage, amperage, power, 0., frequency, powerFactor, 0.)
+
+
+#
+# Delete the outputs of an earlier run, the logs would be appended to and
+# cfgAlg.json would start the run calibrated. The output directory must not
+# hold the inputs or be the current directory, where the live files are.
+#
+def clearOutputs(outDir, fileNames) :
+    outDir = os.path.realpath(outDir)
+    if outDir == os.path.realpath(os.getcwd()) or \
+            any(os.path.dirname(os.path.realpath(fileName)) == outDir for fileName in fileNames) :
+        raise ValueError("Output directory " + outDir + " holds live or input files, use another --out")
+
+    for name in os.listdir(outDir) :
+        if name.startswith(("energyMaster_", alg.cfgAlgFileName)) :
+            os.remove(os.path.join(outDir, name))
+    pubScribe.topicFiles.clear()
+    pubScribe.topicSegments.clear()
+
+
+#
+# Alerts and status go to csv, one line each
+#
+def publishReplay(dest, topic, data, hdr="") :
+    if pubScribe.EMAIL_SMS in dest :
+        dest = pubScribe.CSV_FILE
+        data = data.replace("\n", " ")
+    pubScribe.pubRecord(dest, topic, data, hdr)
+
+
+#
+# Point energyMaster at the replayed channels. Per channel settings are taken
+# from the configured channel of the same name, defaults otherwise.
+#
+def setupChannels(chanNames, thresholds) :
+    n = len(chanNames)
+    configured = {name : chan for chan, name in enumerate(em.chanNames)}
+
+    def byName(values, default) :
+        return [values[configured[name]] if name in configured and configured[name] < len(values) else default \
+                for name in chanNames]
+
+    em.chanIdleIntervals = byName(em.chanIdleIntervals, 5)
+    em.runTimeAlert = byName(em.runTimeAlert, 30*60)
+    em.minIntervalBtwEmails = byName(em.minIntervalBtwEmails, 600)
+    em.chanNames = chanNames
+    em.chanPorts = [REPLAY_PORT] * n
+    em.chanAddrs = list(range(1, n+1))
+    em.chanOnThresholds = thresholds
+    em.chanBuses = em.groupChanBuses()
+
+    em.st = chanState.ChanState(n)
+    em.st.fill("pollInterval", em.tInterval)
+    em.captureBufs = []
+
+
+def replay(fileNames, outDir="replay", threshold=None, gapOff=2.) :
+    global virtualTime
+
+    # Channel per input file
+    inputs = []
+    for fileName in fileNames :
+        base = os.path.basename(fileName)
+        if base.endswith(".bin") :
+            chanName, reason, cols = captureBuffer.load(fileName)
+            inputs.append((chanName, cols))
+        else :
+            inputs.append((base[:-len(".csv")].split("logDetails_")[-1], os.path.abspath(fileName)))
+
+    chanNames = [name for name, source in inputs]
+    configNames = list(em.chanNames)
+    configured = dict(zip(em.chanNames, em.chanOnThresholds))
+    thresholds = [threshold if threshold is not None else configured.get(name, 5) for name in chanNames]
+
+    os.makedirs(outDir, exist_ok=True)
+    clearOutputs(outDir, fileNames)
+    os.chdir(outDir)
+
+    setupChannels(chanNames, thresholds)
+    em.displayEnabled = 0
+    em.checkpointInterval = 0
+    em.nextCapacity = float('inf')
+    em.publish = publishReplay
+    pubScribe.MQTT_ENABLED = 0
+    pubScribe.INFLUX_DB_ENABLED = 0
+    pubScribe.clock = virtualClock
+    alg.calAlgInit(chanNames, em.tInterval, configNames)
+
+    streams = []
+    for chan, (name, source) in enumerate(inputs) :
+        if isinstance(source, dict) :
+            streams.append(captureStream(source, chan))
+        else :
+            streams.append(detailsStream(source, chan, gapOff, em.tInterval))
+
+    buses = {REPLAY_PORT : [0]}
+    busReadings = {REPLAY_PORT : [None]}
+    samples = 0
+    first = None
+    t0 = time.perf_counter()
+    for t, chan, reading in heapq.merge(*streams) :
+        virtualTime = t
+        if first is None :
+            first = t
+        buses[REPLAY_PORT][0] = chan
+        busReadings[REPLAY_PORT][0] = reading
+
+        em.periodicTasks(datetime.datetime.fromtimestamp(t))
+        em.updatePower(em.storeReadings(buses, busReadings, t), t)
+        samples += 1
+    dt = time.perf_counter() - t0
+    alg.flushCfg()
+
+    return {"samples": samples, "seconds": dt, "samplesPerSec": samples / dt if dt else 0.,
+            "virtualHours": (virtualTime - first) / 3600. if first is not None else 0.,
+            "cycles": dict(zip(chanNames, [em.st.cyclesToday[chan] + em.st.cyclesYesterday[chan] \
+                    for chan in range(len(chanNames))]))}
+
+
+# === Main ==================================================================
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay logDetails csv or capture files through energyMaster")
+    parser.add_argument("files", nargs="+", help="energyMaster_logDetails_<chan>.csv or capture .bin files")
+    parser.add_argument("--out", default="replay", help="output directory for logs and cfgAlg.json")
+    parser.add_argument("--threshold", type=float, help="on threshold in Watts for every channel")
+    parser.add_argument("--gap", type=float, default=2., help="seconds without an on reading taken as off")
+    args = parser.parse_args()
+
+    try :
+        result = replay(args.files, args.out, args.threshold, args.gap)
+    except ValueError as e :
+        parser.error(str(e))
+    print("{} samples, {:.1f} virtual hours in {:.2f} s, {:.0f} samples/s".format(result["samples"], \
+            result["virtualHours"], result["seconds"], result["samplesPerSec"]))
+    print("Cycles (today and yesterday): " + str(result["cycles"]))
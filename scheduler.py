@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Drift free sampling scheduler. A single long-lived thread calls a tick
+    function at absolute time.monotonic() deadlines spaced by the interval,
+    instead of re-arming a threading.Timer from inside each tick. The first
+    deadline is aligned to a wall clock multiple of the interval.
+
+    A tick that starts after its deadline is late. A tick that runs past the
+    next deadline is an overrun, and the deadlines it covered are counted as
+    skipped rather than queued up. TickStats keeps the counts and the start
+    jitter (start time minus deadline).
+
+        sched = Scheduler(0.5, myTick)
+        sched.start()
+        ...
+        print(sched.stats.summary())
+        sched.stop()
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import time
+import threading
+from array import array
+
+
+#
+# Tick timing statistics
+#     lateFraction of the interval is the start delay above which a tick is late.
+#     The last JITTER_WINDOW start delays are kept for percentiles.
+#
+JITTER_WINDOW = 512
+
+class TickStats :
+    def __init__(self, interval, lateFraction=0.1) :
+        self.interval = interval
+        self.lateThreshold = interval * lateFraction
+        self.reset()
+
+    def reset(self) :
+        self.ticks = 0
+        self.late = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.jitterSum = 0.
+        self.jitterMax = 0.
+        self.window = array('d', bytes(8 * JITTER_WINDOW))
+
+    #
+    # Record the start delay of a tick
+    #
+    def started(self, jitter) :
+        self.window[self.ticks % JITTER_WINDOW] = jitter
+        self.ticks += 1
+        self.jitterSum += jitter
+        if jitter > self.jitterMax :
+            self.jitterMax = jitter
+        if jitter > self.lateThreshold :
+            self.late += 1
+
+    #
+    # Given the deadline just served and the time the tick finished, return the
+    # next deadline, counting an overrun and the deadlines it skipped
+    #
+    def finished(self, deadline, now) :
+        deadline += self.interval
+        if now > deadline :
+            missed = int((now - deadline) // self.interval) + 1
+            self.overruns += 1
+            self.skipped += missed
+            deadline += missed * self.interval
+        return deadline
+
+    def jitterPercentile(self, pct) :
+        n = min(self.ticks, JITTER_WINDOW)
+        if not n :
+            return 0.
+        recent = sorted(self.window[:n])
+        return recent[min(n - 1, int(n * pct / 100.))]
+
+    def summary(self) :
+        return {"ticks": self.ticks, "late": self.late, "overruns": self.overruns, "skipped": self.skipped,
+                "jitterMeanMs": 1000. * self.jitterSum / self.ticks if self.ticks else 0.,
+                "jitterP95Ms": 1000. * self.jitterPercentile(95),
+                "jitterMaxMs": 1000. * self.jitterMax}
+
+
+#
+# First deadline on the monotonic clock, aligned to the next wall clock multiple of interval
+#
+def alignedDeadline(interval) :
+    return time.monotonic() + interval - (time.time() % interval)
+
+
+#
+# Single thread scheduler
+#
+class Scheduler(threading.Thread) :
+    def __init__(self, interval, tick, lateFraction=0.1) :
+        threading.Thread.__init__(self, name="scheduler", daemon=True)
+        self.interval = interval
+        self.tick = tick
+        self.stats = TickStats(interval, lateFraction)
+        self.stopEvent = threading.Event()
+
+    def stop(self) :
+        self.stopEvent.set()
+
+    def run(self) :
+        deadline = alignedDeadline(self.interval)
+
+        while not self.stopEvent.wait(max(0., deadline - time.monotonic())) :
+            self.stats.started(time.monotonic() - deadline)
+
+            try :
+                self.tick()
+            except Exception as e :
+                print("Exception in scheduled tick: " + str(e))
+
+            deadline = self.stats.finished(deadline, time.monotonic())
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    import random
+
+    def tick() :
+        time.sleep(random.choice([0.01, 0.01, 0.01, 0.15]))    # Occasional overrun
+
+    sched = Scheduler(0.1, tick)
+    sched.start()
+    time.sleep(3)
+    sched.stop()
+    print(sched.stats.summary())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+"""
+Copyright(C) 2026, BrucesHobbies
+All Rights Reserved
+
+AUTHOR: BrucesHobbies
+DATE: 10/17/2026
+REVISION HISTORY
+  DATE        AUTHOR          CHANGES
+  yyyy/mm/dd  --------------- -------------------------------------
+
+
+OVERVIEW:
+    Screen buffer terminal renderer. A frame is drawn into an in-memory buffer
+    with put(), then render() compares it with the frame on the terminal and
+    writes only the changed span of each changed row, as a single
+    sys.stdout.write. There is no clear screen between frames, so there is no
+    flicker over SSH. A full redraw is done on the first frame, after a
+    terminal resize and every fullEvery frames to repair stray prints.
+
+        screen = Screen()
+        screen.clear()
+        screen.put(row, col, "text")
+        screen.render()
+
+    Rows and columns are ANSI cursor positions, 1 based, with 0 treated as 1
+    as the terminal does.
+
+LICENSE:
+    This program code and documentation are for personal private use only. 
+    No commercial use of this code is allowed without prior written consent.
+
+    This program is free for you to inspect, study, and modify for your 
+    personal private use. 
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, version 3 of the License.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+
+import sys
+import shutil
+
+
+CSI = "\033["
+
+
+class Screen :
+    def __init__(self, out=None, fullEvery=60) :
+        self.out = out
+        self.fullEvery = fullEvery
+        self.rows = 0
+        self.cols = 0
+        self.back = []
+        self.front = None       # Frame on the terminal, None forces a full redraw
+        self.redraw = False     # Set by invalidate() from any thread
+        self.frames = 0
+        self.bytesWritten = 0
+
+    #
+    # Terminal size as (rows, cols)
+    #
+    def size(self) :
+        termSize = shutil.get_terminal_size()
+        return termSize.lines, termSize.columns
+
+    #
+    # Start a new blank frame
+    #
+    def clear(self) :
+        rows, cols = self.size()
+        if (rows, cols) != (self.rows, self.cols) :
+            self.rows, self.cols = rows, cols
+            self.front = None
+        self.back = [bytearray(b" " * cols) for row in range(rows)]
+
+    #
+    # Force a full redraw on the next render, after other output to the terminal
+    #
+    def invalidate(self) :
+        self.redraw = True
+
+    #
+    # Draw text into the frame, a newline continues at column 1 of the next row
+    #
+    def put(self, row, col, text) :
+        row = max(row, 1) - 1
+        col = max(col, 1) - 1
+        for line in str(text).split("\n") :
+            if row >= self.rows :
+                return
+            if col < self.cols :
+                b = line.encode("ascii", "replace")[:self.cols - col]
+                self.back[row][col:col+len(b)] = b
+            row += 1
+            col = 0
+
+    #
+    # Write the changed span of each changed row in one write
+    #
+    def render(self) :
+        parts = []
+        if self.front is None or self.redraw or (self.fullEvery and self.frames % self.fullEvery == 0) :
+            self.redraw = False
+            parts.append(CSI + "H" + CSI + "J")
+            self.front = [bytearray(b" " * self.cols) for row in range(self.rows)]
+
+        for row, (new, old) in enumerate(zip(self.back, self.front)) :
+            if new == old :
+                continue
+            first = 0
+            while new[first] == old[first] :
+                first += 1
+            last = len(new) - 1
+            while new[last] == old[last] :
+                last -= 1
+            parts.append(CSI + str(row+1) + ";" + str(first+1) + "H" + new[first:last+1].decode("ascii"))
+
+        if parts :
+            parts.append(CSI + str(self.rows) + ";1H")      # Park the cursor on the last row
+            s = "".join(parts)
+            out = self.out or sys.stdout
+            out.write(s)
+            out.flush()
+            self.bytesWritten += len(s)
+
+        self.front = self.back
+        self.frames += 1
+
+
+# === Test code ==================================================================
+if __name__ == '__main__':
+    import io
+    import time
+
+    class FixedScreen(Screen) :
+        def size(self) :
+            return 40, 120
+
+    out = io.StringIO()
+    screen = FixedScreen(out, fullEvery=0)
+
+    def frame(n) :
+        screen.clear()
+        for row in range(1, 33) :
+            screen.put(row, 0, "Label {:2d}         :".format(row))
+            for chan in range(10) :
+                screen.put(row, 20 + 10*chan, "{: 8.1f}".format(row * chan + (n if row < 8 else 0)))
+        screen.render()
+
+    frame(0)
+    fullBytes = screen.bytesWritten
+    print("Full frame  : {} bytes".format(fullBytes))
+    n = 100
+    t0 = time.perf_counter()
+    for i in range(1, n+1) :
+        frame(i)
+    dt = time.perf_counter() - t0
+    print("Diff frames : {:.0f} bytes/frame, {:.2f} ms/frame, one write each".format( \
+            (screen.bytesWritten - fullBytes) / n, dt * 1000. / n))